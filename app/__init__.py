@@ -1,3 +1,12 @@
 from .factory import create_app
 
-flask_app = create_app()
\ No newline at end of file
+_flask_app = None
+
+def __getattr__(name):
+    # Built on first access so importing app.* (workers, beat, MCP) does not construct an extra app.
+    global _flask_app
+    if name == "flask_app":
+        if _flask_app is None:
+            _flask_app = create_app()
+        return _flask_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,86 @@
+import click
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pymongo import UpdateOne
+from app.repositories import job_store, upload_store, result_cache
+
+TIMESTAMP_FIELDS = ("created_at", "updated_at")
+
+def parse_timestamp(value: str) -> datetime:
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        parsed = parsedate_to_datetime(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def backfill_job_dates(batch_size: int = 1000) -> dict:
+    jobs = job_store.get_jobs()
+    query = {"$or": [{field: {"$type": "string"}} for field in TIMESTAMP_FIELDS]}
+    projection = {field: 1 for field in TIMESTAMP_FIELDS}
+    stats = {"scanned": 0, "updated": 0, "unparseable": 0}
+
+    ops = []
+    for job in jobs.find(query, projection).batch_size(batch_size):
+        stats["scanned"] += 1
+        fields = {}
+        for field in TIMESTAMP_FIELDS:
+            if isinstance(job.get(field), str):
+                try:
+                    fields[field] = parse_timestamp(job[field])
+                except (TypeError, ValueError):
+                    stats["unparseable"] += 1
+        if fields:
+            ops.append(UpdateOne({"_id": job["_id"]}, {"$set": fields}))
+        if len(ops) >= batch_size:
+            stats["updated"] += jobs.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        stats["updated"] += jobs.bulk_write(ops, ordered=False).modified_count
+
+    return stats
+
+def backfill_job_expiry(batch_size: int = 1000) -> dict:
+    jobs = job_store.get_jobs()
+    stats = {"scanned": 0, "updated": 0}
+
+    ops = []
+    for job in jobs.find({"expires_at": {"$exists": False}}, {"type": 1, "created_at": 1}).batch_size(batch_size):
+        stats["scanned"] += 1
+        created_at = job.get("created_at")
+        if not isinstance(created_at, datetime):
+            continue
+        ops.append(UpdateOne({"_id": job["_id"]}, {"$set": {"expires_at": job_store.expires_at(job.get("type"), created_at)}}))
+        if len(ops) >= batch_size:
+            stats["updated"] += jobs.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        stats["updated"] += jobs.bulk_write(ops, ordered=False).modified_count
+
+    return stats
+
+def register_commands(app):
+    @app.cli.group("jobs")
+    def jobs_cli():
+        """Maintenance commands for the Mongo jobs collection."""
+
+    @jobs_cli.command("ensure-indexes")
+    def ensure_indexes():
+        """Create the jobs, upload session and result cache indexes (idempotent)."""
+        job_store.ensure_indexes()
+        upload_store.ensure_indexes()
+        result_cache.ensure_indexes()
+        click.echo("Indexes ensured")
+
+    @jobs_cli.command("backfill-dates")
+    @click.option("--batch-size", default=1000, show_default=True)
+    def backfill_dates(batch_size):
+        """Convert string created_at/updated_at values to BSON dates."""
+        click.echo(backfill_job_dates(batch_size))
+
+    @jobs_cli.command("backfill-expiry")
+    @click.option("--batch-size", default=1000, show_default=True)
+    def backfill_expiry(batch_size):
+        """Set expires_at on jobs created before retention was configured (run after backfill-dates)."""
+        click.echo(backfill_job_expiry(batch_size))
@@ -1,8 +1,8 @@
 import os
+from threading import Thread
 from flasgger import Swagger
 from flask import Flask, request, jsonify
 from flask_login import current_user
-from pymongo import MongoClient
 from flask_cors import CORS
 from dotenv import load_dotenv
 from flask_admin import Admin
@@ -11,16 +11,26 @@ from flask_admin.contrib.sqla import ModelView
 from app.extensions import db, login_manager, oauth, migrate
 from app.models import User, Job
 from app.settings import Settings
+from app.repositories import job_store, upload_store, result_cache
 from app.routes.health import health_bp
-from app.rag.rag_pipeline import query_history
-from app.mcp.agent import run_agent
 from app.routes.agent import agent_bp
-from app.schemas import JobStatusResponse, ParseJobRequest, ImageUploadRequest, ProcessedFile
+from app.streaming import wants_event_stream, sse_response
+from app.request_limits import LimitedRequest
+from app.schemas import JobStatusResponse, ParseJobRequest, ImageUploadRequest, ProcessedFile, TransformSpec
 
 load_dotenv()
 
+def _ensure_indexes(app):
+    try:
+        job_store.ensure_indexes()
+        upload_store.ensure_indexes()
+        result_cache.ensure_indexes()
+    except Exception as e:
+        app.logger.warning(f"Could not ensure Mongo indexes: {e}")
+
 def create_app():
     app = Flask(__name__)
+    app.request_class = LimitedRequest
     app.config.from_object(Settings)
 
     db.init_app(app)
@@ -34,18 +44,25 @@ def create_app():
         "JobStatus": JobStatusResponse.model_json_schema(ref_template="#/definitions/{model}"),
         "ParseJobRequest": ParseJobRequest.model_json_schema(ref_template="#/definitions/{model}"),
         "ImageUploadRequest": ImageUploadRequest.model_json_schema(ref_template="#/definitions/{model}"),
-        "ProcessedFile": ProcessedFile.model_json_schema(ref_template="#/definitions/{model}")
+        "ProcessedFile": ProcessedFile.model_json_schema(ref_template="#/definitions/{model}"),
+        "TransformSpec": TransformSpec.model_json_schema(ref_template="#/definitions/{model}")
     }
     Swagger(app,
             config=Settings.SWAGGER_CONFIG,
             template={**Settings.SWAGGER_TEMPLATE, "definitions": definitions})
 
-    client = MongoClient(app.config["MONGO_URI"])
-    app.mongo_db = client[Settings.MONGO_DB_NAME]
-    app.jobs = app.mongo_db[Settings.MONGO_COLLECTION_NAME]
+    app.jobs = job_store.get_jobs()
+    app.mongo_db = app.jobs.database
+    # Off the startup path: an unreachable Mongo would otherwise block create_app for the
+    # server selection timeout. `flask jobs ensure-indexes` does the same synchronously.
+    Thread(target=_ensure_indexes, args=(app,), name="mongo-indexes", daemon=True).start()
 
     os.makedirs(app.config["FILE_OUTPUT_DIR"], exist_ok=True)
 
+    @app.errorhandler(413)
+    def payload_too_large(e):
+        return jsonify({"error": "payload_too_large", "max": request.max_content_length}), 413
+
     app.register_blueprint(health_bp, url_prefix="/api")
 
     from .routes import blueprints
@@ -65,16 +82,26 @@ def create_app():
 
     @app.route("/rag", methods=["POST"])
     def rag_query():
+        from app.rag.rag_pipeline import answer_question, stream_answer
+
         question = request.json.get("question")
-        answer = query_history(question)
-        return jsonify({"answer": answer})
+        if wants_event_stream():
+            return sse_response(stream_answer(question))
+        return jsonify(answer_question(question))
 
     @app.route("/agent", methods=["POST"])
     def agent_query():
+        from app.mcp.agent import run_agent, stream_agent
+
         query = request.json.get("query")
+        if wants_event_stream():
+            return sse_response(stream_agent(query))
         answer = run_agent(query)
         return jsonify({"answer": answer})
 
+    from .commands import register_commands
+    register_commands(app)
+
     admin = Admin(app, name="Control Panel")
     admin.add_view(ModelView(User, db.session))
     admin.add_view(ModelView(Job, db.session))
@@ -0,0 +1,181 @@
+import os
+import json
+import time
+import queue
+import logging
+import redis
+from collections import defaultdict
+from datetime import datetime
+from threading import Event, Lock, Thread
+from app.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("ready", "failed")
+
+_publisher: redis.Redis | None = None
+_publisher_pid: int | None = None
+_hub = None
+_lock = Lock()
+
+def channel(job_id: str) -> str:
+    return f"{Settings.JOB_EVENTS_CHANNEL_PREFIX}{job_id}"
+
+def _get_publisher() -> redis.Redis:
+    global _publisher, _publisher_pid
+
+    if _publisher is None or _publisher_pid != os.getpid():
+        with _lock:
+            if _publisher is None or _publisher_pid != os.getpid():
+                _publisher = redis.Redis.from_url(Settings.REDIS_URL)
+                _publisher_pid = os.getpid()
+
+    return _publisher
+
+def publish(job_id: str, fields: dict):
+    event = {"job_id": job_id, **fields}
+    try:
+        _get_publisher().publish(channel(job_id), json.dumps(event, default=str))
+    except redis.RedisError as e:
+        logger.warning(f"[{job_id}] Failed to publish job event: {e}")
+
+class JobEventHub:
+    """One pattern subscription per process, fanned out to per-subscriber queues.
+
+    Subscribers only hold a queue, so the number of open streams is bounded by
+    the web worker's connection limit rather than by threads.
+    """
+
+    def __init__(self, redis_url: str):
+        self.redis_url = redis_url
+        self._subscribers: dict = defaultdict(set)
+        self._lock = Lock()
+        self._thread: Thread | None = None
+        self._pid: int | None = None
+        self._ready = Event()
+
+    def _ensure_listener(self):
+        if self._thread is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._ready = Event()
+            self._thread = Thread(target=self._run, name="job-events", daemon=True)
+            self._thread.start()
+
+    def subscribe(self, job_ids: list[str]) -> queue.Queue:
+        """Register a queue for ``job_ids`` once the pattern subscription is live.
+
+        Anything published after this returns reaches the queue, so callers read the
+        current state afterwards and miss nothing in between.
+        """
+        subscriber = queue.Queue(maxsize=Settings.JOB_EVENTS_QUEUE_SIZE)
+        with self._lock:
+            self._ensure_listener()
+            for job_id in job_ids:
+                self._subscribers[job_id].add(subscriber)
+            ready = self._ready
+        if not ready.wait(Settings.JOB_EVENTS_SUBSCRIBE_TIMEOUT):
+            logger.warning("Job event subscription not confirmed, live updates may be delayed")
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue, job_ids: list[str]):
+        with self._lock:
+            for job_id in job_ids:
+                self._subscribers[job_id].discard(subscriber)
+                if not self._subscribers[job_id]:
+                    del self._subscribers[job_id]
+
+    def _dispatch(self, event: dict):
+        with self._lock:
+            subscribers = list(self._subscribers.get(event.get("job_id"), ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                logger.warning(f"[{event.get('job_id')}] Dropping job event for slow subscriber")
+
+    def _run(self):
+        while True:
+            try:
+                pubsub = redis.Redis.from_url(self.redis_url).pubsub()
+                pubsub.psubscribe(f"{Settings.JOB_EVENTS_CHANNEL_PREFIX}*")
+                for message in pubsub.listen():
+                    if message["type"] == "psubscribe":
+                        self._ready.set()
+                    elif message["type"] == "pmessage":
+                        self._dispatch(json.loads(message["data"]))
+            except Exception:
+                self._ready.clear()
+                logger.exception("Job event listener failed, reconnecting")
+                time.sleep(1)
+
+def get_hub() -> JobEventHub:
+    global _hub
+
+    if _hub is None:
+        with _lock:
+            if _hub is None:
+                _hub = JobEventHub(Settings.REDIS_URL)
+
+    return _hub
+
+def _timestamp(value) -> datetime | None:
+    """``updated_at`` at Mongo's millisecond precision; events carry it as ``str(datetime)``."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
+def _superseded(event: dict, snapshot: dict) -> bool:
+    """Whether ``event`` was already reflected in (or is older than) the snapshot sent for its job."""
+    event_at, snapshot_at = _timestamp(event.get("updated_at")), _timestamp(snapshot.get("updated_at"))
+    if event_at is None or snapshot_at is None:
+        return False
+    if event_at != snapshot_at:
+        return event_at < snapshot_at
+    # Same millisecond: only drop it if it carries nothing the snapshot did not.
+    return all(event.get(field, snapshot.get(field)) == snapshot.get(field) for field in ("status", "progress"))
+
+def stream_job_events(jobs, job_ids: list[str]):
+    """Yield ``(event, data)`` pairs for ``job_ids`` until each reaches a terminal status.
+
+    Events queued while the snapshot was read are dropped if the snapshot already
+    covers them, so a client never sees a job move backwards.
+    """
+    hub = get_hub()
+    subscriber = hub.subscribe(job_ids)
+    try:
+        pending = set(job_ids)
+        projection = {"_id": 0, "job_id": 1, "status": 1, "progress": 1, "updated_at": 1}
+        found = set()
+        snapshots = {}
+        for job in jobs.find({"job_id": {"$in": job_ids}}, projection):
+            found.add(job["job_id"])
+            snapshots[job["job_id"]] = job
+            yield "status", job
+            if job.get("status") in TERMINAL_STATUSES:
+                pending.discard(job["job_id"])
+        for job_id in pending - found:
+            yield "error", {"job_id": job_id, "error": "not_found"}
+            pending.discard(job_id)
+
+        while pending:
+            try:
+                event = subscriber.get(timeout=Settings.JOB_EVENTS_HEARTBEAT)
+            except queue.Empty:
+                yield "ping", {}
+                continue
+            snapshot = snapshots.get(event.get("job_id"))
+            if snapshot is not None:
+                if _superseded(event, snapshot):
+                    continue
+                # Events arrive in publish order, so everything after this one is newer too.
+                del snapshots[event["job_id"]]
+            yield "status", event
+            if event.get("status") in TERMINAL_STATUSES:
+                pending.discard(event["job_id"])
+    finally:
+        hub.unsubscribe(subscriber, job_ids)
@@ -1,5 +1,6 @@
 import json
 import redis
+from threading import Lock
 from langchain.agents import initialize_agent
 from langchain.tools import Tool
 from app.mcp.tools import convert_tool, parse_tool
@@ -7,8 +8,19 @@ from app.rag.embeddings import get_llm
 from app.rag.rag_pipeline import query_history
 from app.settings import Settings
 
-llm = get_llm()
-r = redis.Redis(host=Settings.REDIS_HOST, port=Settings.REDIS_PORT, db=0)
+_agent = None
+_redis = None
+_lock = Lock()
+
+def get_redis() -> redis.Redis:
+    global _redis
+
+    if _redis is None:
+        with _lock:
+            if _redis is None:
+                _redis = redis.Redis(host=Settings.REDIS_HOST, port=Settings.REDIS_PORT, db=0)
+
+    return _redis
 
 def convert_image_wrapper(query: str):
     try:
@@ -61,19 +73,47 @@ tools = [
     )
 ]
 
-agent = initialize_agent(
-    tools,
-    llm,
-    agent="zero-shot-react-description",
-    handle_parsing_errors=True,
-    verbose=True,
-    max_iterations=2
-)
+def get_agent():
+    global _agent
+
+    if _agent is None:
+        with _lock:
+            if _agent is None:
+                _agent = initialize_agent(
+                    tools,
+                    get_llm(),
+                    agent="zero-shot-react-description",
+                    handle_parsing_errors=True,
+                    verbose=True,
+                    max_iterations=2
+                )
+
+    return _agent
 
 def run_agent(query: str):
-    cached = r.get(query)
+    cached = get_redis().get(query)
     if cached:
         return json.loads(cached)
-    result = agent.invoke(query)
-    r.set(query, json.dumps(result), ex=3600)
-    return result
\ No newline at end of file
+    result = get_agent().invoke(query)
+    get_redis().set(query, json.dumps(result), ex=3600)
+    return result
+
+def stream_agent(query: str):
+    """Yield agent progress as ``(event, data)`` pairs: actions, observations, then the answer."""
+    cached = get_redis().get(query)
+    if cached:
+        yield "answer", json.loads(cached)
+        return
+
+    output = None
+    for chunk in get_agent().stream({"input": query}):
+        for action in chunk.get("actions", []):
+            yield "action", {"tool": action.tool, "tool_input": action.tool_input}
+        for step in chunk.get("steps", []):
+            yield "observation", {"tool": step.action.tool, "observation": step.observation}
+        if "output" in chunk:
+            output = chunk["output"]
+
+    result = {"input": query, "output": output}
+    get_redis().set(query, json.dumps(result, default=str), ex=3600)
+    yield "answer", result
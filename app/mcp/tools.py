@@ -1,8 +1,7 @@
 import logging
 import uuid
-import os
-from datetime import datetime
-from pymongo import MongoClient
+from app.repositories import job_store
+from app.storage import get_storage
 from app.tasks.image_tasks import process_image
 from app.tasks.parser_tasks import parse_page
 
@@ -11,24 +10,7 @@ logger = logging.getLogger(__name__)
 
 def create_job_record(job_id: str, job_type: str, extra: dict = None):
     try:
-        client = MongoClient(os.getenv("MONGO_URI"))
-        db = client.get_default_database()
-        jobs = db["jobs"]
-
-        base_record = {
-            "job_id": job_id,
-            "type": job_type,
-            "status": "queued",
-            "progress": 0,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
-            "parsed_data": [],
-            "processed_files": []
-        }
-        if extra:
-            base_record.update(extra)
-
-        jobs.insert_one(base_record)
+        job_store.create_job(job_id, job_type, extra)
         logger.info(f"[{job_id}] Job record created in MongoDB")
     except Exception as e:
         logger.error(f"[{job_id}] Failed to create job record: {e}")
@@ -36,8 +18,9 @@ def create_job_record(job_id: str, job_type: str, extra: dict = None):
 def convert_tool(filename: str, filepath: str) -> dict:
     try:
         job_id = f"convert-{uuid.uuid4().hex}"
-        create_job_record(job_id, "convert", {"filename": filename, "filepath": filepath})
-        process_image.delay(job_id=job_id, filename=filename, filepath=filepath)
+        file_key = get_storage().put_path(filepath)
+        create_job_record(job_id, "convert", {"filename": filename, "filepath": filepath, "file_path": file_key})
+        process_image.delay(job_id=job_id, filename=filename, filepath=file_key)
 
         return {
             "job_id": job_id,
@@ -0,0 +1,48 @@
+import numpy as np
+from threading import Lock
+
+class SemanticAnswerCache:
+    """Returns a stored answer when a new question's embedding is within ``threshold`` cosine similarity.
+
+    Entries belong to one vector store generation and are dropped when it changes.
+    """
+
+    def __init__(self, max_entries: int, threshold: float):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.generation = None
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._answers: list[str] = []
+        self._lock = Lock()
+
+    @staticmethod
+    def _normalize(vector: list[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def _reset(self, generation):
+        self.generation = generation
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._answers = []
+
+    def lookup(self, vector: list[float], generation) -> tuple[str, float] | None:
+        with self._lock:
+            if generation != self.generation:
+                self._reset(generation)
+                return None
+            if not self._answers:
+                return None
+            scores = self._vectors @ self._normalize(vector)
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                return self._answers[best], float(scores[best])
+            return None
+
+    def store(self, vector: list[float], answer: str, generation):
+        with self._lock:
+            if generation != self.generation:
+                self._reset(generation)
+            row = self._normalize(vector)[np.newaxis, :]
+            self._vectors = row if not self._answers else np.vstack([self._vectors, row])[-self.max_entries:]
+            self._answers = (self._answers + [answer])[-self.max_entries:]
@@ -1,6 +1,19 @@
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from langchain_core.embeddings import Embeddings
+from collections import OrderedDict
+from threading import Lock
+from array import array
+import hashlib
+import logging
+import redis
 import os
+from app.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+_embeddings = None
+_lock = Lock()
 
 def get_llm(model: str = "models/gemini-flash-latest", temperature: float = 0):
     return ChatGoogleGenerativeAI(
@@ -9,8 +22,113 @@ def get_llm(model: str = "models/gemini-flash-latest", temperature: float = 0):
         temperature=temperature
     )
 
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper caching vectors by ``(model, kind, sha256(text))`` in an LRU with an optional Redis tier."""
+
+    def __init__(self, embeddings: Embeddings, model: str, max_size: int, redis_url: str | None = None, ttl: int = 0):
+        self.embeddings = embeddings
+        self.model = model
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lru: OrderedDict = OrderedDict()
+        self._lock = Lock()
+        self._redis = redis.Redis.from_url(redis_url) if redis_url else None
+        self.counters = {"lru_hits": 0, "redis_hits": 0, "misses": 0}
+
+    def _key(self, kind: str, text: str) -> str:
+        return f"emb:{self.model}:{kind}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    def _lru_get(self, key: str):
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+            return vector
+
+    def _lru_put(self, key: str, vector: list[float]):
+        with self._lock:
+            self._lru[key] = vector
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_size:
+                self._lru.popitem(last=False)
+
+    def _redis_get_many(self, keys: list[str]) -> list:
+        if not self._redis or not keys:
+            return [None] * len(keys)
+        try:
+            return [array("f", raw).tolist() if raw else None for raw in self._redis.mget(keys)]
+        except redis.RedisError as e:
+            logger.warning(f"Embedding cache read failed: {e}")
+            return [None] * len(keys)
+
+    def _redis_put_many(self, items: dict):
+        if not self._redis or not items:
+            return
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for key, vector in items.items():
+                pipe.set(key, array("f", vector).tobytes(), ex=self.ttl or None)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    def _embed(self, kind: str, texts: list[str], compute) -> list[list[float]]:
+        keys = [self._key(kind, text) for text in texts]
+        found = {}
+
+        for key in keys:
+            vector = self._lru_get(key)
+            if vector is not None:
+                found[key] = vector
+        self.counters["lru_hits"] += len(found)
+
+        remote_keys = [key for key in dict.fromkeys(keys) if key not in found]
+        for key, vector in zip(remote_keys, self._redis_get_many(remote_keys)):
+            if vector is not None:
+                found[key] = vector
+                self._lru_put(key, vector)
+                self.counters["redis_hits"] += 1
+
+        missing = {key: text for key, text in zip(keys, texts) if key not in found}
+        if missing:
+            self.counters["misses"] += len(missing)
+            computed = dict(zip(missing, compute(list(missing.values()))))
+            for key, vector in computed.items():
+                self._lru_put(key, vector)
+            self._redis_put_many(computed)
+            found.update(computed)
+
+        return [found[key] for key in keys]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._embed("doc", texts, self.embeddings.embed_documents)
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed("query", [text], lambda texts: [self.embeddings.embed_query(texts[0])])[0]
+
+    def stats(self) -> dict:
+        lookups = sum(self.counters.values())
+        hits = self.counters["lru_hits"] + self.counters["redis_hits"]
+        return {**self.counters, "size": len(self._lru), "hit_rate": round(hits / lookups, 4) if lookups else 0.0}
+
 def get_embeddings():
-    return GoogleGenerativeAIEmbeddings(
-        model="models/gemini-embedding-001",
-        google_api_key=os.getenv("GEMINI_API_KEY")
-    )
\ No newline at end of file
+    global _embeddings
+
+    if _embeddings is None:
+        with _lock:
+            if _embeddings is None:
+                embeddings = GoogleGenerativeAIEmbeddings(
+                    model=Settings.EMBEDDING_MODEL,
+                    google_api_key=os.getenv("GEMINI_API_KEY")
+                )
+                if Settings.EMBEDDING_CACHE_SIZE > 0:
+                    embeddings = CachedEmbeddings(
+                        embeddings,
+                        model=Settings.EMBEDDING_MODEL,
+                        max_size=Settings.EMBEDDING_CACHE_SIZE,
+                        redis_url=Settings.REDIS_URL if Settings.EMBEDDING_CACHE_REDIS else None,
+                        ttl=Settings.EMBEDDING_CACHE_TTL
+                    )
+                _embeddings = embeddings
+
+    return _embeddings
@@ -0,0 +1,153 @@
+import math
+import logging
+import faiss
+import numpy as np
+from threading import Thread, Lock
+from langchain_core.documents import Document
+from app.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+def ann_factory_string(tier: str, n: int) -> str:
+    if tier == "hnsw":
+        return f"HNSW{Settings.VECTOR_HNSW_M},Flat"
+    nlist = Settings.VECTOR_IVF_NLIST or max(1, int(4 * math.sqrt(n)))
+    return f"IVF{nlist},Flat"
+
+def build_ann_index(vectors: np.ndarray, tier: str) -> faiss.Index:
+    n, dimension = vectors.shape
+    index = faiss.index_factory(dimension, ann_factory_string(tier, n))
+
+    if not index.is_trained:
+        nlist = faiss.extract_index_ivf(index).nlist
+        sample_size = min(n, nlist * Settings.VECTOR_TRAIN_POINTS_PER_LIST)
+        sample = vectors[np.random.default_rng(0).choice(n, sample_size, replace=False)]
+        index.train(sample)
+
+    index.add(vectors)
+    return index
+
+def index_kind(index: faiss.Index) -> str:
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf"
+    return "flat"
+
+def search_params(index: faiss.Index, nprobe: int | None = None, ef_search: int | None = None):
+    kind = index_kind(index)
+    if kind == "ivf":
+        return faiss.SearchParametersIVF(nprobe=nprobe or Settings.VECTOR_DEFAULT_NPROBE)
+    if kind == "hnsw":
+        return faiss.SearchParametersHNSW(efSearch=ef_search or Settings.VECTOR_DEFAULT_EF_SEARCH)
+    return None
+
+def search(vectorstore, vector: list[float], k: int, nprobe: int | None = None, ef_search: int | None = None):
+    """Search ``vectorstore.index`` with per-request ANN parameters, skipping tombstoned entries."""
+    index = vectorstore.index
+    query = np.array([vector], dtype=np.float32)
+    # Deletes on ANN tiers only drop the docstore mapping, so over-fetch to fill k.
+    fetch_k = k if index_kind(index) == "flat" else k * 2
+    distances, labels = index.search(query, fetch_k, params=search_params(index, nprobe, ef_search))
+
+    results = []
+    for distance, label in zip(distances[0], labels[0]):
+        doc_id = vectorstore.index_to_docstore_id.get(int(label))
+        if label == -1 or doc_id is None:
+            continue
+        doc = vectorstore.docstore.search(doc_id)
+        if isinstance(doc, str):
+            continue
+        results.append((doc, float(distance)))
+        if len(results) == k:
+            break
+    return results
+
+def add(vectorstore, texts: list[str], vectors: list[list[float]], metadatas: list[dict], ids: list[str]) -> list[str]:
+    """Append rows labelled from ``index.ntotal``.
+
+    ``FAISS.add_embeddings`` labels new rows ``len(index_to_docstore_id) + j``, which
+    collides with live labels once an ANN-tier delete has dropped mappings but kept vectors.
+    """
+    if len(ids) != len(set(ids)):
+        raise ValueError("Duplicate ids found in the ids list.")
+    matrix = np.array(vectors, dtype=np.float32)
+    if vectorstore._normalize_L2:
+        faiss.normalize_L2(matrix)
+
+    start = vectorstore.index.ntotal
+    vectorstore.index.add(matrix)
+    vectorstore.docstore.add({
+        doc_id: Document(page_content=text, metadata=metadata)
+        for doc_id, text, metadata in zip(ids, texts, metadatas)
+    })
+    vectorstore.index_to_docstore_id.update({start + j: doc_id for j, doc_id in enumerate(ids)})
+    return ids
+
+def delete(vectorstore, ids: list[str]) -> bool:
+    if index_kind(vectorstore.index) == "flat":
+        return vectorstore.delete(ids)
+
+    # IVF labels are not renumbered on remove_ids and HNSW cannot remove at all,
+    # so ANN tiers keep the vector and drop its docstore entry instead.
+    doc_ids = set(ids)
+    for label, doc_id in list(vectorstore.index_to_docstore_id.items()):
+        if doc_id in doc_ids:
+            del vectorstore.index_to_docstore_id[label]
+    vectorstore.docstore.delete(list(doc_ids))
+    return True
+
+class IndexMigrator:
+    """Moves a growing Flat index to the configured ANN tier in the background.
+
+    Vectors are copied under ``lock``'s read side; training and building happen
+    outside it so searches and writes continue. Rows appended in the meantime are replayed
+    before the swap, and a delete during the build aborts this attempt.
+    """
+
+    def __init__(self, vectorstore, lock):
+        self.vectorstore = vectorstore
+        self.lock = lock
+        self.generation = 0
+        self.migrating = False
+        self._state_lock = Lock()
+
+    def record_delete(self):
+        self.generation += 1
+
+    def maybe_migrate(self):
+        tier = Settings.VECTOR_INDEX_TIER
+        index = self.vectorstore.index
+        if tier == "flat" or index_kind(index) != "flat" or index.ntotal < Settings.VECTOR_INDEX_THRESHOLD:
+            return
+        with self._state_lock:
+            if self.migrating:
+                return
+            self.migrating = True
+        Thread(target=self._migrate, args=(tier,), name="faiss-migrate", daemon=True).start()
+
+    def _migrate(self, tier: str):
+        try:
+            with self.lock.read():
+                flat = self.vectorstore.index
+                copied = flat.ntotal
+                generation = self.generation
+                vectors = flat.reconstruct_n(0, copied)
+
+            logger.info(f"Migrating FAISS index from flat to {tier} with {copied} vectors")
+            index = build_ann_index(vectors, tier)
+
+            with self.lock.write():
+                if self.generation != generation or self.vectorstore.index is not flat:
+                    logger.info("FAISS index changed during migration, retrying on next write")
+                    return
+                if flat.ntotal > copied:
+                    index.add(flat.reconstruct_n(copied, flat.ntotal - copied))
+                self.vectorstore.index = index
+
+            logger.info(f"FAISS index migrated to {tier} ({index.ntotal} vectors)")
+        except Exception:
+            logger.exception("FAISS index migration failed")
+        finally:
+            with self._state_lock:
+                self.migrating = False
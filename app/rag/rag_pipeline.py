@@ -1,19 +1,118 @@
+import time
+from threading import Lock
 from langchain.chains import create_retrieval_chain
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from app.rag.vector_store import get_vectorstore
-from app.rag.embeddings import get_llm
+from app.rag.embeddings import get_llm, get_embeddings
 from app.rag.prompt import rag_prompt
+from app.rag.answer_cache import SemanticAnswerCache
+from app.settings import Settings
 
-llm = get_llm()
+_llm = None
+_document_chain = None
+_retrieval_chain = None
+_lock = Lock()
+_answer_cache = SemanticAnswerCache(
+    max_entries=Settings.RAG_ANSWER_CACHE_SIZE,
+    threshold=Settings.RAG_ANSWER_CACHE_THRESHOLD
+)
 
-def query_history(question: str) -> str:
-    vectorstore = get_vectorstore()
-    document_chain = create_stuff_documents_chain(llm, rag_prompt)
+def get_rag_llm():
+    global _llm
+
+    if _llm is None:
+        with _lock:
+            if _llm is None:
+                _llm = get_llm()
+
+    return _llm
+
+def get_document_chain():
+    global _document_chain
+
+    if _document_chain is None:
+        llm = get_rag_llm()
+        with _lock:
+            if _document_chain is None:
+                _document_chain = create_stuff_documents_chain(llm, rag_prompt)
+
+    return _document_chain
+
+def get_retriever():
+    return get_vectorstore().as_retriever(search_kwargs={"k": 5})
+
+def get_retrieval_chain():
+    global _retrieval_chain
+
+    if _retrieval_chain is None:
+        document_chain = get_document_chain()
+        with _lock:
+            if _retrieval_chain is None:
+                _retrieval_chain = create_retrieval_chain(
+                    retriever=get_retriever(),
+                    combine_docs_chain=document_chain
+                )
+
+    return _retrieval_chain
+
+def _cache_lookup(question: str):
+    if Settings.RAG_ANSWER_CACHE_SIZE <= 0:
+        return None, None, None
+    generation = get_vectorstore().generation()
+    vector = get_embeddings().embed_query(question)
+    return generation, vector, _answer_cache.lookup(vector, generation)
 
-    retrieval_chain = create_retrieval_chain(
-        retriever=vectorstore.as_retriever(search_kwargs={"k": 5}),
-        combine_docs_chain=document_chain
-    )
+def answer_question(question: str) -> dict:
+    started = time.perf_counter()
+    generation, vector, hit = _cache_lookup(question)
 
-    result = retrieval_chain.invoke({"input": question})
-    return result.get("output", "No answer found")
\ No newline at end of file
+    if hit:
+        answer, similarity = hit
+        return {
+            "answer": answer,
+            "cached": True,
+            "similarity": round(similarity, 4),
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    result = get_retrieval_chain().invoke({"input": question})
+    answer = result.get("answer", "No answer found")
+    if vector is not None:
+        _answer_cache.store(vector, answer, generation)
+
+    return {
+        "answer": answer,
+        "cached": False,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
+
+def stream_answer(question: str):
+    """Yield ``("sources", docs)``, then ``("token", text)`` chunks as the LLM emits them, then ``("done", meta)``."""
+    started = time.perf_counter()
+    generation, vector, hit = _cache_lookup(question)
+
+    if hit:
+        answer, similarity = hit
+        yield "token", answer
+        yield "done", {
+            "cached": True,
+            "similarity": round(similarity, 4),
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+        return
+
+    docs = get_retriever().invoke(question)
+    yield "sources", [{"page_content": doc.page_content, "metadata": doc.metadata} for doc in docs]
+
+    parts = []
+    for chunk in get_document_chain().stream({"input": question, "context": docs}):
+        parts.append(chunk)
+        yield "token", chunk
+
+    if vector is not None:
+        _answer_cache.store(vector, "".join(parts), generation)
+
+    yield "done", {"cached": False, "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+def query_history(question: str) -> str:
+    return answer_question(question)["answer"]
@@ -0,0 +1,109 @@
+import os
+import time
+import logging
+import requests
+from threading import Lock
+from typing import Any, Iterable, List, Optional, Tuple
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from app.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+class VectorServiceError(RuntimeError):
+    pass
+
+class VectorServiceClient(VectorStore):
+    """LangChain ``VectorStore`` backed by the shared vector service (``app.rag.vector_service``)."""
+
+    def __init__(self, base_url: str, timeout: float | None = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout or Settings.VECTOR_SERVICE_TIMEOUT
+        self._session: requests.Session | None = None
+        self._session_pid: int | None = None
+        self._lock = Lock()
+        self._generation: tuple[float, str] | None = None
+
+    @property
+    def embeddings(self) -> Optional[Embeddings]:
+        return None
+
+    def _get_session(self) -> requests.Session:
+        if self._session is None or self._session_pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._session_pid != os.getpid():
+                    self._session = requests.Session()
+                    if Settings.VECTOR_SERVICE_TOKEN:
+                        self._session.headers["X-Vector-Token"] = Settings.VECTOR_SERVICE_TOKEN
+                    self._session_pid = os.getpid()
+        return self._session
+
+    def _request(self, method: str, path: str, payload: dict | None = None) -> dict:
+        try:
+            response = self._get_session().request(
+                method, f"{self.base_url}{path}", json=payload, timeout=self.timeout
+            )
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise VectorServiceError(f"Vector service {method} {path} failed: {e}") from e
+        return response.json()
+
+    def add(self, text: str, metadata: dict | None = None, id: str | None = None) -> str:
+        return self._request("POST", "/add", {"text": text, "metadata": metadata or {}, "id": id})["id"]
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        payload = {"texts": texts, "metadatas": metadatas or [{} for _ in texts], "ids": ids}
+        return self._request("POST", "/add_batch", payload)["ids"]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        payload = {"query": query, "k": k, **kwargs}
+        results = self._request("POST", "/search", payload)["results"]
+        return [
+            (Document(page_content=r["page_content"], metadata=r.get("metadata") or {}), r["score"])
+            for r in results
+        ]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, **kwargs)]
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return False
+        return self._request("POST", "/delete", {"ids": ids})["deleted"]
+
+    def stats(self) -> dict:
+        return self._request("GET", "/stats")
+
+    def generation(self) -> str:
+        """The service's write generation, reused for ``VECTOR_GENERATION_TTL`` seconds to spare a round trip per query."""
+        cached = self._generation
+        if cached and time.monotonic() - cached[0] < Settings.VECTOR_GENERATION_TTL:
+            return cached[1]
+        generation = self.stats()["generation"]
+        self._generation = (time.monotonic(), generation)
+        return generation
+
+    def snapshot(self) -> dict:
+        return self._request("POST", "/snapshot")
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        **kwargs: Any
+    ) -> "VectorServiceClient":
+        client = cls(kwargs.pop("base_url", Settings.VECTOR_SERVICE_URL))
+        client.add_texts(texts, metadatas=metadatas)
+        return client
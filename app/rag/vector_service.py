@@ -0,0 +1,161 @@
+import hmac
+import uuid
+import queue
+import logging
+from concurrent.futures import Future
+from threading import Thread
+from flask import Flask, request, jsonify
+from app.settings import Settings
+from app.rag.vector_store import get_local_vectorstore, index_lock, save_snapshot
+from app.rag import index_tiering
+from app.rag.index_tiering import IndexMigrator
+
+logger = logging.getLogger(__name__)
+
+class BatchWriter:
+    """Single writer thread that folds whatever adds are already queued into one embedding call and one index add.
+
+    It never waits for more work: age-based batching happens once, in each client's ``IngestBuffer``.
+    """
+
+    def __init__(self, vectorstore, max_batch: int, migrator: IndexMigrator):
+        self.vectorstore = vectorstore
+        self.migrator = migrator
+        self.max_batch = max_batch
+        self.writes = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = Thread(target=self._run, name="vector-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: list[str], metadatas: list[dict], ids: list[str]) -> Future:
+        future = Future()
+        self._queue.put((texts, metadatas, ids, future))
+        return future
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _drain(self) -> list:
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        while size < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._drain()
+            texts = [t for item in batch for t in item[0]]
+            metadatas = [m for item in batch for m in item[1]]
+            ids = [i for item in batch for i in item[2]]
+            try:
+                vectors = self.vectorstore.embedding_function.embed_documents(texts)
+                with index_lock().write():
+                    index_tiering.add(self.vectorstore, texts, vectors, metadatas, ids)
+                    self.writes += 1
+                logger.info(f"Vector writer flushed {len(texts)} texts from {len(batch)} requests")
+                for item in batch:
+                    item[3].set_result(item[2])
+                self.migrator.maybe_migrate()
+            except Exception as e:
+                logger.exception("Vector writer batch failed")
+                for item in batch:
+                    item[3].set_exception(e)
+
+def create_service() -> Flask:
+    if not Settings.VECTOR_SERVICE_TOKEN:
+        raise RuntimeError("VECTOR_SERVICE_TOKEN must be set: the vector service does not accept anonymous requests")
+    service = Flask(__name__)
+    vectorstore = get_local_vectorstore()
+    migrator = IndexMigrator(vectorstore, index_lock())
+    writer = BatchWriter(
+        vectorstore,
+        max_batch=Settings.VECTOR_WRITE_BATCH_SIZE,
+        migrator=migrator
+    )
+    migrator.maybe_migrate()
+    instance = uuid.uuid4().hex[:8]
+
+    @service.before_request
+    def require_token():
+        if not hmac.compare_digest(request.headers.get("X-Vector-Token", ""), Settings.VECTOR_SERVICE_TOKEN):
+            return jsonify({"error": "unauthorized"}), 401
+
+    def enqueue(texts: list[str], metadatas: list[dict], ids: list[str] | None):
+        ids = [i or uuid.uuid4().hex for i in ids] if ids else [uuid.uuid4().hex for _ in texts]
+        future = writer.submit(texts, metadatas, ids)
+        if request.args.get("wait", "true") == "true":
+            future.result()
+        return ids
+
+    @service.route("/add", methods=["POST"])
+    def add():
+        data = request.get_json(force=True)
+        if not data.get("text"):
+            return jsonify({"error": "Missing 'text' field"}), 400
+        ids = enqueue([data["text"]], [data.get("metadata") or {}], [data.get("id")])
+        return jsonify({"id": ids[0]})
+
+    @service.route("/add_batch", methods=["POST"])
+    def add_batch():
+        data = request.get_json(force=True)
+        texts = data.get("texts") or []
+        metadatas = data.get("metadatas") or [{} for _ in texts]
+        if len(metadatas) != len(texts):
+            return jsonify({"error": "texts and metadatas length mismatch"}), 400
+        return jsonify({"ids": enqueue(texts, metadatas, data.get("ids")) if texts else []})
+
+    @service.route("/search", methods=["POST"])
+    def search():
+        data = request.get_json(force=True)
+        query = data.get("query")
+        if not query:
+            return jsonify({"error": "Missing 'query' field"}), 400
+        vector = vectorstore.embedding_function.embed_query(query)
+        with index_lock().read():
+            results = index_tiering.search(
+                vectorstore,
+                vector,
+                k=int(data.get("k", 4)),
+                nprobe=data.get("nprobe"),
+                ef_search=data.get("ef_search")
+            )
+        return jsonify({"results": [
+            {"page_content": doc.page_content, "metadata": doc.metadata, "score": float(score)}
+            for doc, score in results
+        ]})
+
+    @service.route("/delete", methods=["POST"])
+    def delete():
+        ids = (request.get_json(force=True) or {}).get("ids") or []
+        with index_lock().write():
+            known = [i for i in ids if i in vectorstore.index_to_docstore_id.values()]
+            deleted = bool(known) and index_tiering.delete(vectorstore, known)
+            if deleted:
+                migrator.record_delete()
+        return jsonify({"deleted": bool(deleted), "ids": known})
+
+    @service.route("/stats", methods=["GET"])
+    def stats():
+        return jsonify({
+            "vectors": vectorstore.index.ntotal,
+            "generation": f"{instance}:{writer.writes}:{migrator.generation}",
+            "index": index_tiering.index_kind(vectorstore.index),
+            "migrating": migrator.migrating,
+            "pending_writes": writer.pending(),
+            "embedding_cache": getattr(vectorstore.embedding_function, "stats", dict)()
+        })
+
+    @service.route("/snapshot", methods=["POST"])
+    def snapshot():
+        return jsonify(save_snapshot(vectorstore))
+
+    return service
+
+if __name__ == "__main__":
+    create_service().run(host="0.0.0.0", port=8500, threaded=True)
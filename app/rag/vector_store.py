@@ -1,20 +1,94 @@
+import os
+import time
+import uuid
+import atexit
+import pickle
+import shutil
 import faiss
 import logging
-from threading import Lock
+from concurrent.futures import Future
+from contextlib import contextmanager
+from threading import Lock, Thread, Event, Condition
+from langchain_core.vectorstores import VectorStore
 from langchain_community.vectorstores import FAISS
 from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from app.settings import Settings
 from .embeddings import get_embeddings
+from .vector_client import VectorServiceClient
 
 logger = logging.getLogger(__name__)
 
+INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "docstore.pkl"
+CURRENT_FILE = "CURRENT"
+
 _vectorstore = None
+_client = None
+_buffers: dict = {}
 _lock = Lock()
+_snapshot_lock = Lock()
+_snapshot_stop = Event()
+_stats = {"load_seconds": None, "loaded_from": None, "snapshot_ntotal": 0}
+
+class RWLock:
+    """Many concurrent readers or one writer.
+
+    Waiting writers hold back new readers, so a steady stream of searches cannot starve ingest.
+    """
+
+    def __init__(self):
+        self._cond = Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+_index_lock = RWLock()
+
+def _snapshots_dir() -> str:
+    return os.path.join(Settings.VECTOR_STORE_DIR, "snapshots")
+
+def _current_snapshot() -> str | None:
+    try:
+        with open(os.path.join(Settings.VECTOR_STORE_DIR, CURRENT_FILE)) as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return None
+    path = os.path.join(_snapshots_dir(), name)
+    return path if os.path.isdir(path) else None
 
 def _create_vectorstore() -> FAISS:
     embeddings = get_embeddings()
-    test_vec = embeddings.embed_query("dimension check")
-    dimension = len(test_vec)
+    dimension = Settings.EMBEDDING_DIMENSION
 
     index = faiss.IndexFlatL2(dimension)
     docstore = InMemoryDocstore({})
@@ -28,36 +102,258 @@ def _create_vectorstore() -> FAISS:
         index_to_docstore_id={}
     )
 
-def get_vectorstore() -> FAISS:
+def _load_vectorstore(path: str) -> FAISS:
+    started = time.perf_counter()
+
+    flags = faiss.IO_FLAG_MMAP if Settings.VECTOR_STORE_MMAP else 0
+    index = faiss.read_index(os.path.join(path, INDEX_FILE), flags)
+    if flags and faiss.try_extract_index_ivf(index) is not None:
+        logger.warning("FAISS IVF index loaded with VECTOR_STORE_MMAP; its inverted lists are read-only and adds will fail")
+    with open(os.path.join(path, DOCSTORE_FILE), "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+
+    _stats["load_seconds"] = time.perf_counter() - started
+    _stats["loaded_from"] = path
+    _stats["snapshot_ntotal"] = index.ntotal
+    logger.info(f"FAISS vectorstore loaded from {path} ({index.ntotal} vectors) in {_stats['load_seconds']:.3f}s")
+
+    return FAISS(
+        embedding_function=get_embeddings(),
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=index_to_docstore_id
+    )
+
+def _dir_size(path: str) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+def _fsync_file(path: str):
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+
+def save_snapshot(vectorstore: FAISS | None = None) -> dict:
+    """Write the index and docstore to a new snapshot directory and atomically repoint CURRENT at it."""
+    if vectorstore is None:
+        vectorstore = _vectorstore
+    if vectorstore is None:
+        return {}
+
+    with _snapshot_lock:
+        started = time.perf_counter()
+        os.makedirs(_snapshots_dir(), exist_ok=True)
+
+        name = f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}"
+        tmp_path = os.path.join(_snapshots_dir(), f".tmp-{name}")
+        os.makedirs(tmp_path)
+
+        # Cloning only reads the index, so searches keep running while it copies.
+        with _index_lock.read():
+            index = faiss.clone_index(vectorstore.index)
+            state = (vectorstore.docstore, dict(vectorstore.index_to_docstore_id))
+            payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+        faiss.write_index(index, os.path.join(tmp_path, INDEX_FILE))
+        with open(os.path.join(tmp_path, DOCSTORE_FILE), "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        _fsync_file(os.path.join(tmp_path, INDEX_FILE))
+
+        path = os.path.join(_snapshots_dir(), name)
+        os.rename(tmp_path, path)
+
+        current_tmp = os.path.join(Settings.VECTOR_STORE_DIR, f".{CURRENT_FILE}.{name}")
+        with open(current_tmp, "w") as f:
+            f.write(name)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(current_tmp, os.path.join(Settings.VECTOR_STORE_DIR, CURRENT_FILE))
+
+        _stats["snapshot_ntotal"] = index.ntotal
+        _prune_snapshots()
+
+        result = {
+            "path": path,
+            "vectors": index.ntotal,
+            "size_bytes": _dir_size(path),
+            "write_seconds": round(time.perf_counter() - started, 3),
+            "load_seconds": _stats["load_seconds"]
+        }
+        logger.info(f"FAISS snapshot written: {result}")
+        return result
+
+def _prune_snapshots():
+    names = sorted(n for n in os.listdir(_snapshots_dir()) if not n.startswith("."))
+    for name in names[:-max(Settings.VECTOR_SNAPSHOTS_KEPT, 1)]:
+        shutil.rmtree(os.path.join(_snapshots_dir(), name), ignore_errors=True)
+
+def _snapshot_if_dirty():
+    if _vectorstore is not None and _vectorstore.index.ntotal != _stats["snapshot_ntotal"]:
+        save_snapshot(_vectorstore)
+
+def _snapshot_loop():
+    while not _snapshot_stop.wait(Settings.VECTOR_SNAPSHOT_INTERVAL):
+        try:
+            _snapshot_if_dirty()
+        except Exception:
+            logger.exception("Periodic FAISS snapshot failed")
+
+def _on_shutdown():
+    _snapshot_stop.set()
+    try:
+        _snapshot_if_dirty()
+    except Exception:
+        logger.exception("FAISS snapshot on shutdown failed")
+
+def get_local_vectorstore() -> FAISS:
+    """The process-local FAISS store; only the vector service process should own one."""
     global _vectorstore
 
     if _vectorstore is None:
         with _lock:
             if _vectorstore is None:
-                _vectorstore = _create_vectorstore()
+                path = _current_snapshot()
+                _vectorstore = _load_vectorstore(path) if path else _create_vectorstore()
+
+                atexit.register(_on_shutdown)
+                if Settings.VECTOR_SNAPSHOT_INTERVAL > 0:
+                    Thread(target=_snapshot_loop, name="faiss-snapshot", daemon=True).start()
 
     return _vectorstore
 
-def add_metadata(vectorstore: FAISS, text: str, metadata: dict | None = None):
+def index_lock() -> RWLock:
+    """Searches take ``read()``; adds, deletes and index swaps take ``write()``."""
+    return _index_lock
+
+def get_vectorstore() -> VectorServiceClient:
+    global _client
+
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = VectorServiceClient(Settings.VECTOR_SERVICE_URL)
+
+    return _client
+
+class IngestBuffer:
+    """Coalesces ``add_texts`` calls and flushes them as one batch by size or age.
+
+    Each flush is a single ``add_texts`` call, i.e. one embedding request and
+    one index add. ``submit`` returns a future resolving to the new ids.
+    """
+
+    def __init__(self, vectorstore: VectorStore, max_size: int, max_age: float):
+        self.vectorstore = vectorstore
+        self.max_size = max_size
+        self.max_age = max_age
+        self._items: list = []
+        self._count = 0
+        self._oldest: float | None = None
+        self._cond = Condition()
+        self._write_lock = Lock()
+        self._thread: Thread | None = None
+        self._pid: int | None = None
+
+    def _ensure_thread(self):
+        if self._thread is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = Thread(target=self._run, name="ingest-buffer", daemon=True)
+            self._thread.start()
+
+    def submit(self, texts: list[str], metadatas: list[dict] | None = None) -> Future:
+        future = Future()
+        with self._cond:
+            self._ensure_thread()
+            self._items.append((texts, metadatas or [{} for _ in texts], future))
+            self._count += len(texts)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            if self._count >= self.max_size:
+                self._cond.notify()
+        return future
+
+    def _take(self) -> list:
+        batch, self._items, self._count, self._oldest = self._items, [], 0, None
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._items:
+                    self._cond.wait()
+                while self._items and self._count < self.max_size:
+                    remaining = self._oldest + self.max_age - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._take()
+            self._write(batch)
+
+    def _write(self, batch: list):
+        if not batch:
+            return
+        with self._write_lock:
+            texts = [t for item in batch for t in item[0]]
+            metadatas = [m for item in batch for m in item[1]]
+            try:
+                ids = self.vectorstore.add_texts(texts=texts, metadatas=metadatas)
+            except Exception as e:
+                logger.exception(f"Failed to ingest {len(texts)} texts")
+                for item in batch:
+                    item[2].set_exception(e)
+                return
+
+            logger.info(f"Ingested {len(texts)} texts from {len(batch)} calls")
+            offset = 0
+            for item_texts, _, future in batch:
+                future.set_result(ids[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+    def flush(self):
+        with self._cond:
+            batch = self._take()
+        self._write(batch)
+
+def get_ingest_buffer(vectorstore: VectorStore) -> IngestBuffer:
+    buffer = _buffers.get(id(vectorstore))
+    if buffer is None:
+        with _lock:
+            buffer = _buffers.get(id(vectorstore))
+            if buffer is None:
+                buffer = IngestBuffer(
+                    vectorstore,
+                    max_size=Settings.VECTOR_INGEST_BATCH_SIZE,
+                    max_age=Settings.VECTOR_INGEST_MAX_AGE_MS / 1000
+                )
+                _buffers[id(vectorstore)] = buffer
+    return buffer
+
+def flush():
+    for buffer in list(_buffers.values()):
+        buffer.flush()
+
+atexit.register(flush)
+
+def add_metadata(vectorstore: VectorStore, text: str, metadata: dict | None = None) -> Future:
     if not metadata:
         metadata = {}
 
     logger.info("Adding metadata to vectorstore")
 
-    vectorstore.add_texts(
-        texts=[text],
-        metadatas=[metadata]
-    )
+    return get_ingest_buffer(vectorstore).submit([text], [metadata])
 
-def add_documents(vectorstore: FAISS, docs: list, chunk_size: int = 1000, chunk_overlap: int = 200):
+def add_documents(vectorstore: VectorStore, docs: list, chunk_size: int = 1000, chunk_overlap: int = 200) -> Future:
     splitter = RecursiveCharacterTextSplitter(
         chunk_size=chunk_size,
         chunk_overlap=chunk_overlap
     )
     chunks = splitter.split_documents(docs)
     logger.info(f"Adding {len(chunks)} chunks to vectorstore")
-    vectorstore.add_documents(chunks)
+    return get_ingest_buffer(vectorstore).submit(
+        [chunk.page_content for chunk in chunks],
+        [chunk.metadata for chunk in chunks]
+    )
 
-def search(vectorstore: FAISS, query: str, k: int = 5):
+def search(vectorstore: VectorStore, query: str, k: int = 5):
     logger.info(f"Searching vectorstore for query: {query}")
-    return vectorstore.similarity_search(query, k=k)
\ No newline at end of file
+    return vectorstore.similarity_search(query, k=k)
@@ -0,0 +1,135 @@
+import os
+import logging
+from datetime import datetime, timedelta
+from threading import Lock
+from pymongo import MongoClient, ReturnDocument, ASCENDING, DESCENDING
+from pymongo.collection import Collection
+from app.settings import Settings
+from app.job_events import publish
+
+logger = logging.getLogger(__name__)
+
+_client: MongoClient | None = None
+_client_pid: int | None = None
+_lock = Lock()
+
+def _reset_after_fork():
+    # A MongoClient must never be shared across fork(); children build their own pool.
+    global _client, _client_pid, _lock
+    _client = None
+    _client_pid = None
+    _lock = Lock()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+def get_client() -> MongoClient:
+    global _client, _client_pid
+
+    if _client is None or _client_pid != os.getpid():
+        with _lock:
+            if _client is None or _client_pid != os.getpid():
+                _client = MongoClient(
+                    Settings.MONGO_URI,
+                    maxPoolSize=Settings.MONGO_MAX_POOL_SIZE,
+                    connect=False
+                )
+                _client_pid = os.getpid()
+                logger.info(f"Mongo job store client created in pid {_client_pid}")
+
+    return _client
+
+def get_jobs() -> Collection:
+    db = get_client().get_default_database(default=Settings.MONGO_DB_NAME)
+    return db[Settings.MONGO_COLLECTION_NAME]
+
+def ensure_indexes(jobs: Collection | None = None):
+    jobs = jobs if jobs is not None else get_jobs()
+    jobs.create_index([("job_id", ASCENDING)], unique=True, name="job_id_unique")
+    jobs.create_index([("status", ASCENDING), ("updated_at", DESCENDING)], name="status_updated_at")
+    jobs.create_index([("type", ASCENDING), ("updated_at", DESCENDING)], name="type_updated_at")
+    jobs.create_index([("updated_at", DESCENDING), ("job_id", DESCENDING)], name="updated_at_job_id")
+    jobs.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl")
+    jobs.create_index([("file_path", ASCENDING)], sparse=True, name="file_path")
+    jobs.create_index([("processed_files.file_path", ASCENDING)], sparse=True, name="processed_file_path")
+    jobs.create_index([("files.file_path", ASCENDING)], sparse=True, name="batch_file_path")
+
+def expires_at(job_type: str, start: datetime) -> datetime:
+    days = Settings.JOB_RETENTION_DAYS.get(job_type, Settings.JOB_RETENTION_DAYS["default"])
+    return start + timedelta(days=days)
+
+def _update(job_id: str, fields: dict):
+    fields["updated_at"] = datetime.utcnow()
+    get_jobs().update_one({"job_id": job_id}, {"$set": fields})
+    publish(job_id, fields)
+
+def create_job(job_id: str, job_type: str, extra: dict | None = None) -> dict:
+    now = datetime.utcnow()
+    record = {
+        "job_id": job_id,
+        "type": job_type,
+        "status": "queued",
+        "progress": 0,
+        "created_at": now,
+        "updated_at": now,
+        "expires_at": expires_at(job_type, now),
+        "parsed_data": [],
+        "processed_files": []
+    }
+    if extra:
+        record.update(extra)
+
+    get_jobs().insert_one(record)
+    record.pop("_id", None)
+    publish(job_id, {"status": record["status"], "progress": record["progress"], "updated_at": now})
+    return record
+
+def mark_processing(job_id: str, progress: int = 25):
+    _update(job_id, {"status": "processing", "progress": progress})
+
+def set_progress(job_id: str, progress: int, **fields):
+    _update(job_id, {"progress": progress, **fields})
+
+def complete(job_id: str, result: dict):
+    # Results are usually pydantic JSON dumps; timestamps are owned by the store and stay BSON dates.
+    fields = {k: v for k, v in result.items() if k not in ("created_at", "updated_at")}
+    _update(job_id, {**fields, "status": result.get("status", "ready"), "progress": 100})
+
+def advance(job_id: str, done: int = 1):
+    """Atomically add ``done`` to a batch job's ``completed`` count and derive ``progress`` from ``total``."""
+    now = datetime.utcnow()
+    job = get_jobs().find_one_and_update(
+        {"job_id": job_id},
+        [
+            {"$set": {"completed": {"$add": [{"$ifNull": ["$completed", 0]}, done]}, "updated_at": now}},
+            {"$set": {"progress": {"$min": [99, {"$floor": {
+                "$multiply": [100, {"$divide": ["$completed", {"$max": ["$total", 1]}]}]
+            }}]}}}
+        ],
+        projection={"_id": 0, "progress": 1, "completed": 1, "total": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if job:
+        publish(job_id, {"status": "processing", **job, "updated_at": now})
+    return job
+
+def fail(job_id: str, error: str | None = None, **extra):
+    fields = {"status": "failed", "progress": 100, **extra}
+    if error:
+        fields["error"] = error
+    _update(job_id, fields)
+
+def referenced_paths(paths: list[str]) -> set[str]:
+    # Batch jobs record their inputs only under files[], which stay needed until the batch runs.
+    query = {"$or": [
+        {"file_path": {"$in": paths}},
+        {"processed_files.file_path": {"$in": paths}},
+        {"files.file_path": {"$in": paths}},
+    ]}
+    projection = {"_id": 0, "file_path": 1, "processed_files.file_path": 1, "files.file_path": 1}
+    referenced = set()
+    for job in get_jobs().find(query, projection):
+        referenced.add(job.get("file_path"))
+        referenced.update(f.get("file_path") for f in job.get("processed_files") or [])
+        referenced.update(f.get("file_path") for f in job.get("files") or [])
+    return referenced
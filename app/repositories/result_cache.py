@@ -0,0 +1,84 @@
+import re
+import json
+import hashlib
+from datetime import datetime, timedelta
+from pymongo import ASCENDING
+from pymongo.collection import Collection
+from app.settings import Settings
+from app.repositories import job_store
+from app.storage import get_storage, content_hash
+
+_DIGEST_RE = re.compile(r"[0-9a-f]{64}")
+
+def get_results() -> Collection:
+    return job_store.get_jobs().database[Settings.RESULT_CACHE_COLLECTION]
+
+def ensure_indexes(results: Collection | None = None):
+    results = results if results is not None else get_results()
+    results.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl")
+
+def _expires_at(now: datetime) -> datetime:
+    return now + timedelta(days=Settings.RESULT_CACHE_TTL_DAYS)
+
+def source_digest(key: str) -> str:
+    """sha256 of a stored source, free for content-addressed keys and streamed otherwise."""
+    digest = content_hash(key)
+    if _DIGEST_RE.fullmatch(digest):
+        return digest
+    sha = hashlib.sha256()
+    with get_storage().open(key) as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def cache_key(digest: str, params: dict) -> str:
+    return hashlib.sha256(f"{digest}:{json.dumps(params, sort_keys=True)}".encode()).hexdigest()
+
+def lookup(key: str) -> dict | None:
+    entry = get_results().find_one({"_id": key})
+    if not entry:
+        return None
+    # Touching restarts the output's GC grace period, so it survives until the job referencing it is written.
+    if not get_storage().touch(entry["output_key"]):
+        # The output was garbage-collected; forget it so the next run re-creates it.
+        get_results().delete_one({"_id": key})
+        return None
+    now = datetime.utcnow()
+    get_results().update_one(
+        {"_id": key},
+        {"$inc": {"hits": 1}, "$set": {"last_hit_at": now, "expires_at": _expires_at(now)}}
+    )
+    return entry
+
+def store(key: str, output_key: str, ext: str, cpu_seconds: float):
+    now = datetime.utcnow()
+    get_results().update_one(
+        {"_id": key},
+        {
+            "$set": {"output_key": output_key, "ext": ext, "cpu_seconds": cpu_seconds, "expires_at": _expires_at(now)},
+            "$setOnInsert": {"created_at": now, "hits": 0}
+        },
+        upsert=True
+    )
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.cpu_seconds_saved = 0.0
+
+    def hit(self, entry: dict):
+        self.hits += 1
+        self.cpu_seconds_saved += entry.get("cpu_seconds", 0.0)
+
+    def miss(self):
+        self.misses += 1
+
+    def as_dict(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "cpu_seconds_saved": round(self.cpu_seconds_saved, 4)
+        }
@@ -0,0 +1,54 @@
+import os
+import uuid
+from datetime import datetime, timedelta
+from pymongo import ASCENDING
+from pymongo.collection import Collection
+from app.settings import Settings
+from app.repositories import job_store
+
+def get_sessions() -> Collection:
+    return job_store.get_jobs().database[Settings.UPLOAD_SESSION_COLLECTION]
+
+def ensure_indexes(sessions: Collection | None = None):
+    sessions = sessions if sessions is not None else get_sessions()
+    sessions.create_index([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl")
+
+def part_path(upload_id: str) -> str:
+    return os.path.join(Settings.UPLOAD_DIR, f"{upload_id}.part")
+
+def create_session(filename: str, size: int, transform: dict) -> dict:
+    now = datetime.utcnow()
+    session = {
+        "_id": uuid.uuid4().hex,
+        "filename": filename,
+        "size": size,
+        "transform": transform,
+        "created_at": now,
+        "expires_at": now + timedelta(seconds=Settings.UPLOAD_SESSION_TTL)
+    }
+    get_sessions().insert_one(session)
+    os.makedirs(Settings.UPLOAD_DIR, exist_ok=True)
+    open(part_path(session["_id"]), "wb").close()
+    return session
+
+def get_session(upload_id: str) -> dict | None:
+    return get_sessions().find_one({"_id": upload_id})
+
+def offset(upload_id: str) -> int:
+    """Bytes received so far; the part file on disk is the source of truth for resumes."""
+    try:
+        return os.path.getsize(part_path(upload_id))
+    except FileNotFoundError:
+        return 0
+
+def touch(upload_id: str):
+    expires = datetime.utcnow() + timedelta(seconds=Settings.UPLOAD_SESSION_TTL)
+    get_sessions().update_one({"_id": upload_id}, {"$set": {"expires_at": expires}})
+
+def delete_session(upload_id: str, remove_part: bool = True):
+    get_sessions().delete_one({"_id": upload_id})
+    if remove_part:
+        try:
+            os.remove(part_path(upload_id))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,22 @@
+from flask import Request, current_app
+
+def body_limit(limit):
+    """Give a view its own request body limit in place of ``MAX_CONTENT_LENGTH``.
+
+    ``limit`` is a callable so settings are read per request rather than at import.
+    """
+    def decorator(view):
+        view.body_limit = limit
+        return view
+    return decorator
+
+class LimitedRequest(Request):
+    """Request whose ``max_content_length`` honours a per-view ``body_limit``."""
+
+    @property
+    def max_content_length(self) -> int | None:
+        if current_app and self.endpoint:
+            limit = getattr(current_app.view_functions.get(self.endpoint), "body_limit", None)
+            if limit is not None:
+                return limit()
+        return super().max_content_length
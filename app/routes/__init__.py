@@ -3,5 +3,6 @@ from app.routes.parser_routes import bp as parse_bp
 from app.routes.status_routes import bp as status_bp
 from app.routes.mcp_routes import mcp_bp
 from app.routes.rag_routes import rag_bp
+from app.routes.upload_routes import bp as upload_bp
 
-blueprints = [image_bp, parse_bp, status_bp, mcp_bp, rag_bp]
\ No newline at end of file
+blueprints = [image_bp, parse_bp, status_bp, mcp_bp, rag_bp, upload_bp]
\ No newline at end of file
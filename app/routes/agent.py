@@ -1,9 +1,10 @@
 from flask import Blueprint, request, jsonify, current_app
 import os, uuid, json
-from datetime import datetime
-from app.mcp.agent import run_agent
 from app.tasks.parser_tasks import parse_page
 from app.tasks.image_tasks import process_image
+from app.streaming import wants_event_stream, sse_response
+from app.repositories import job_store
+from app.storage import get_storage
 
 agent_bp = Blueprint("agent", __name__)
 
@@ -31,9 +32,12 @@ def post_agent():
         type: file
         required: false
         description: Image file to convert
+    produces:
+      - application/json
+      - text/event-stream
     responses:
       200:
-        description: Agent response
+        description: Agent response (SSE action/observation/answer events with Accept text/event-stream)
       400:
         description: Missing input
       500:
@@ -46,22 +50,11 @@ def post_agent():
             return jsonify({"error": "file_required"}), 400
 
         filename = file.filename
-        output_dir = os.getenv("FILE_OUTPUT_DIR", "./output")
-        os.makedirs(output_dir, exist_ok=True)
-        filepath = os.path.join(output_dir, filename)
-        file.save(filepath)
+        filepath = get_storage().put_stream(file.stream, os.path.splitext(filename)[1])
 
         job_id = f"agent-image-{uuid.uuid4().hex}"
 
-        current_app.jobs.insert_one({
-            "job_id": job_id,
-            "status": "queued",
-            "progress": 0,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
-            "filename": filename,
-            "file_path": filepath
-        })
+        job_store.create_job(job_id, "image", {"filename": filename, "file_path": filepath})
 
         process_image.delay(job_id=job_id, filename=filename, filepath=filepath)
 
@@ -85,14 +78,7 @@ def post_agent():
         if query.startswith("http://") or query.startswith("https://"):
             job_id = f"agent-parse-{uuid.uuid4().hex}"
 
-            current_app.jobs.insert_one({
-                "job_id": job_id,
-                "status": "queued",
-                "progress": 0,
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow(),
-                "url": query
-            })
+            job_store.create_job(job_id, "parse", {"url": query, "limit": 5})
 
             parse_page.delay(job_id=job_id, url=query, limit=5)
 
@@ -105,6 +91,11 @@ def post_agent():
                 }
             }), 200
 
+        from app.mcp.agent import run_agent, stream_agent
+
+        if wants_event_stream():
+            return sse_response(stream_agent(query))
+
         result = run_agent(query)
         return jsonify({
             "input": query,
@@ -1,16 +1,20 @@
-from flask import Blueprint, request, jsonify, current_app
-import os, uuid
-from datetime import datetime
+from flask import Blueprint, request, jsonify
+import os, math, uuid, zipfile
+from celery import chord, group
 from app.schemas import ImageUploadRequest
 from pydantic import ValidationError
-from app.tasks.image_tasks import process_image
+from app.tasks.image_tasks import process_image, process_image_chunk, finalize_image_batch
+from app.settings import Settings
+from app.repositories import job_store
+from app.storage import get_storage
+from app.request_limits import body_limit
 
 bp = Blueprint("image_jobs", __name__)
 
 @bp.route("/jobs/image", methods=["POST"])
 def upload_image():
     """
-    Upload image for processing (grayscale)
+    Upload image for processing (grayscale by default)
     ---
     tags:
       - Jobs
@@ -21,6 +25,11 @@ def upload_image():
         in: formData
         type: file
         required: true
+      - name: transform
+        in: formData
+        type: string
+        required: false
+        description: 'TransformSpec as JSON, e.g. {"grayscale": true, "max_dimension": 1600, "format": "webp", "quality": 80}'
     responses:
       202:
         description: Image job created
@@ -30,26 +39,95 @@ def upload_image():
         return jsonify({"error": "file_required"}), 400
 
     try:
-        data = ImageUploadRequest(filename=file.filename)
+        data = ImageUploadRequest(filename=file.filename, transform=request.form.get("transform"))
+    except ValidationError as e:
+        return jsonify({"error": e.errors(include_context=False)}), 400
+
+    filepath = get_storage().put_stream(file.stream, os.path.splitext(data.filename)[1])
+    transform = data.transform.model_dump()
+
+    job_id = str(uuid.uuid4())
+    job_store.create_job(job_id, "image", {"filename": data.filename, "file_path": filepath, "transform": transform})
+    process_image.delay(job_id, data.filename, filepath, transform)
+
+    return jsonify({"job_id": job_id, "status": "queued"}), 202
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp", ".tif", ".tiff")
+
+def _iter_archive(archive):
+    with zipfile.ZipFile(archive.stream) as zf:
+        members = [m for m in zf.infolist() if not m.is_dir() and m.filename.lower().endswith(IMAGE_EXTENSIONS)]
+        if sum(m.file_size for m in members) > Settings.BATCH_MAX_BYTES:
+            raise ValueError("archive_too_large")
+        for member in members:
+            with zf.open(member) as f:
+                yield os.path.basename(member.filename), f
+
+def _iter_batch_files():
+    for file in request.files.getlist("files"):
+        if file and file.filename:
+            yield file.filename, file.stream
+    archive = request.files.get("archive")
+    if archive:
+        yield from _iter_archive(archive)
+
+@bp.route("/jobs/image:batch", methods=["POST"])
+@body_limit(lambda: Settings.BATCH_MAX_BYTES)
+def upload_image_batch():
+    """
+    Upload many images (or a ZIP archive) as one grayscale batch job
+    ---
+    tags:
+      - Jobs
+    consumes:
+      - multipart/form-data
+    parameters:
+      - name: files
+        in: formData
+        type: file
+        required: false
+        description: Image files (repeat the field for each file)
+      - name: archive
+        in: formData
+        type: file
+        required: false
+        description: ZIP archive of images
+      - name: transform
+        in: formData
+        type: string
+        required: false
+        description: TransformSpec as JSON, applied to every image
+    responses:
+      202:
+        description: Batch job created
+      400:
+        description: No images, too many images or archive too large
+    """
+    storage = get_storage()
+    items = []
+    try:
+        transform = ImageUploadRequest(filename="batch", transform=request.form.get("transform")).transform.model_dump()
+        for filename, stream in _iter_batch_files():
+            data = ImageUploadRequest(filename=filename)
+            if len(items) >= Settings.BATCH_MAX_FILES:
+                return jsonify({"error": "too_many_files", "max": Settings.BATCH_MAX_FILES}), 400
+            key = storage.put_stream(stream, os.path.splitext(data.filename)[1])
+            items.append({"index": len(items), "filename": data.filename, "file_path": key})
     except ValidationError as e:
-        return jsonify({"error": e.errors()}), 400
+        return jsonify({"error": e.errors(include_context=False)}), 400
+    except (ValueError, zipfile.BadZipFile) as e:
+        return jsonify({"error": str(e)}), 400
 
-    output_dir = os.getenv("FILE_OUTPUT_DIR", "./output")
-    os.makedirs(output_dir, exist_ok=True)
-    filepath = os.path.join(output_dir, data.filename)
-    file.save(filepath)
+    if not items:
+        return jsonify({"error": "files_required"}), 400
 
     job_id = str(uuid.uuid4())
-    doc = {
-        "job_id": job_id,
-        "status": "queued",
-        "progress": 0,
-        "filename": data.filename,
-        "file_path": filepath,
-        "created_at": datetime.utcnow().isoformat(),
-        "updated_at": datetime.utcnow().isoformat(),
-    }
-    current_app.jobs.insert_one(doc)
-    process_image.delay(job_id, data.filename, filepath)
-
-    return jsonify({"job_id": job_id, "status": "queued"}), 202
\ No newline at end of file
+    job_store.create_job(job_id, "image_batch", {"total": len(items), "completed": 0, "files": items, "transform": transform})
+
+    chunk_size = math.ceil(len(items) / Settings.BATCH_CHUNKS)
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    # Before dispatch: a fast chord could otherwise finish first and be reset to processing.
+    job_store.mark_processing(job_id, progress=0)
+    chord(group(process_image_chunk.s(job_id, chunk, transform) for chunk in chunks))(finalize_image_batch.s(job_id))
+
+    return jsonify({"job_id": job_id, "status": "queued", "files": len(items), "chunks": len(chunks)}), 202
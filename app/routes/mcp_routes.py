@@ -77,6 +77,12 @@ def search_vectors():
               type: string
             top_k:
               type: integer
+            nprobe:
+              type: integer
+              description: IVF lists to probe (higher = better recall, slower)
+            ef_search:
+              type: integer
+              description: HNSW search breadth (higher = better recall, slower)
     responses:
       200:
         description: Search results
@@ -84,8 +90,9 @@ def search_vectors():
     data = request.get_json(force=True)
     query = data.get("query")
     top_k = data.get("top_k", 5)
+    params = {key: data[key] for key in ("nprobe", "ef_search") if data.get(key)}
     vs = get_vectorstore()
-    results = vs.similarity_search(query, k=top_k)
+    results = vs.similarity_search(query, k=top_k, **params)
     return jsonify({"output": [r.page_content for r in results]})
 
 @mcp_bp.route("/create_job", methods=["POST"])
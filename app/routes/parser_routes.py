@@ -1,9 +1,9 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify
 import uuid
-from datetime import datetime
 from pydantic import ValidationError
 from app.schemas import ParseJobRequest
 from app.tasks.parser_tasks import parse_page
+from app.repositories import job_store
 
 bp = Blueprint("parse_jobs", __name__)
 
@@ -27,6 +27,11 @@ def parse_job():
         type: integer
         required: false
         description: Max number of images to process (default 5)
+      - name: transform
+        in: formData
+        type: string
+        required: false
+        description: 'TransformSpec as JSON (default {"grayscale": true, "format": "webp"})'
     responses:
       202:
         description: Parse job created
@@ -34,21 +39,14 @@ def parse_job():
     try:
         data = ParseJobRequest(
             url=request.form.get("url"),
-            limit=request.form.get("limit")
+            limit=request.form.get("limit"),
+            transform=request.form.get("transform")
         )
     except ValidationError as e:
-        return jsonify({"error": e.errors()}), 400
+        return jsonify({"error": e.errors(include_context=False)}), 400
 
+    transform = data.transform.model_dump()
     job_id = str(uuid.uuid4())
-    doc = {
-        "job_id": job_id,
-        "status": "queued",
-        "progress": 0,
-        "created_at": datetime.utcnow().isoformat(),
-        "updated_at": datetime.utcnow().isoformat(),
-        "url": str(data.url),
-        "limit": data.limit
-    }
-    current_app.jobs.insert_one(doc)
-    parse_page.delay(job_id, str(data.url), data.limit)
+    job_store.create_job(job_id, "parse", {"url": str(data.url), "limit": data.limit, "transform": transform})
+    parse_page.delay(job_id, str(data.url), data.limit, transform)
     return jsonify({"job_id": job_id, "status": "queued"}), 202
\ No newline at end of file
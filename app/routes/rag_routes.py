@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from app.rag.vector_store import get_vectorstore
+from app.rag.vector_store import get_vectorstore, get_ingest_buffer
 
 rag_bp = Blueprint("rag", __name__)
 
@@ -36,10 +36,38 @@ def add_document():
     splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=100)
     chunks = splitter.split_documents([Document(page_content=text, metadata=metadata)])
 
-    vectorstore = get_vectorstore()
-    vectorstore.add_documents(chunks)
+    get_ingest_buffer(get_vectorstore()).submit(
+        [chunk.page_content for chunk in chunks],
+        [chunk.metadata for chunk in chunks]
+    ).result()
 
     return jsonify({
         "message": f"Added {len(chunks)} chunks to vectorstore",
         "metadata": metadata
-    }), 200
\ No newline at end of file
+    }), 200
+
+@rag_bp.route("/vectorstore/snapshot", methods=["POST"])
+def snapshot_vectorstore():
+    """
+    Ask the vector service to write a FAISS snapshot to VECTOR_STORE_DIR
+    ---
+    tags:
+      - RAG
+    responses:
+      200:
+        description: Snapshot path, size and timings
+        schema:
+          type: object
+          properties:
+            path:
+              type: string
+            vectors:
+              type: integer
+            size_bytes:
+              type: integer
+            write_seconds:
+              type: number
+            load_seconds:
+              type: number
+    """
+    return jsonify(get_vectorstore().snapshot()), 200
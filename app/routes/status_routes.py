@@ -1,18 +1,238 @@
-from flask import Blueprint, jsonify, current_app, request, send_file
+import os
+import json
+import base64
+import hashlib
+import mimetypes
+from datetime import datetime
+from flask import Blueprint, Response, jsonify, current_app, request, send_file, stream_with_context
+from werkzeug.wsgi import wrap_file
 from pydantic import ValidationError
-from app.schemas import JobStatusResponse, ProcessedFile
-from email.utils import parsedate_to_datetime
+from PIL import UnidentifiedImageError
+from app.schemas import JobStatusResponse, ProcessedFile, TransformSpec
+from app.job_events import stream_job_events
+from app.settings import Settings
+from app.streaming import sse_response, zip_stream
+from app.storage import get_storage, content_etag
+from app.storage.derivatives import get_derivative_cache
+from app.repositories import result_cache
+from app.tasks.image_tasks import FORMAT_EXTENSIONS, ImageTooLarge, output_ext, render
 
 bp = Blueprint("status_jobs", __name__)
 
-def normalize_datetime_fields(job):
-    for field in ["created_at", "updated_at"]:
-        if field in job and isinstance(job[field], str):
-            try:
-                parsed = parsedate_to_datetime(job[field])
-                job[field] = parsed.isoformat()
-            except Exception:
-                pass
+STATUS_PROJECTION = {
+    "_id": 0, "job_id": 1, "type": 1, "status": 1, "progress": 1,
+    "created_at": 1, "updated_at": 1, "error": 1
+}
+
+def serialize_job(job):
+    return {k: v.isoformat() if isinstance(v, datetime) else v for k, v in job.items()}
+
+def encode_cursor(job):
+    updated_at = job["updated_at"]
+    payload = {"u": updated_at.isoformat() if isinstance(updated_at, datetime) else updated_at, "j": job["job_id"]}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+def decode_cursor(cursor):
+    payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return datetime.fromisoformat(payload["u"]), payload["j"]
+
+DOWNLOAD_PROJECTION = {"_id": 0, "status": 1, "filename": 1, "file_path": 1}
+
+def _offload_response(key, path, download_name):
+    response = Response(mimetype=mimetypes.guess_type(download_name)[0] or "application/octet-stream")
+    response.headers.set("Content-Disposition", "attachment", filename=download_name)
+    if Settings.DOWNLOAD_OFFLOAD == "x-accel":
+        response.headers["X-Accel-Redirect"] = f"{Settings.DOWNLOAD_ACCEL_PREFIX.rstrip('/')}/{key}"
+    else:
+        # The front proxy resolves this against its own working directory, not ours.
+        response.headers["X-Sendfile"] = os.path.abspath(path)
+    return response
+
+def _stream_response(storage, key, download_name):
+    size = storage.size(key)
+    response = Response(
+        wrap_file(request.environ, storage.open(key)),
+        mimetype=mimetypes.guess_type(download_name)[0] or "application/octet-stream",
+        direct_passthrough=True
+    )
+    response.content_length = size
+    response.headers.set("Content-Disposition", "attachment", filename=download_name)
+    etag = content_etag(key)
+    if etag:
+        response.set_etag(etag)
+    return response.make_conditional(request, accept_ranges=True, complete_length=size)
+
+def send_stored_file(key, download_name):
+    """Serve a stored object with validators, Range support and optional front-proxy offload.
+
+    Content-addressed keys never change bytes, so their hash is a strong ETag and the
+    response may be cached as immutable. Legacy path keys fall back to mtime-based validators.
+    """
+    storage = get_storage()
+    etag = content_etag(key)
+    path = storage.local_path(key)
+
+    if etag and etag in request.if_none_match:
+        response = Response(status=304)
+    elif etag and path is not None and Settings.DOWNLOAD_OFFLOAD:
+        response = _offload_response(key, path, download_name)
+    elif path is not None:
+        response = send_file(path, as_attachment=True, download_name=download_name, etag=etag or True, conditional=True)
+    else:
+        response = _stream_response(storage, key, download_name)
+
+    if etag:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = f"public, max-age={Settings.DOWNLOAD_MAX_AGE}, immutable"
+    return response
+
+def derivative_params(args):
+    """``{w, h, format}`` from the query string, or ``None`` when the original is wanted."""
+    if not any(args.get(name) for name in ("w", "h", "format")):
+        return None
+    params = {"w": None, "h": None, "format": args.get("format") or None}
+    for name in ("w", "h"):
+        if args.get(name):
+            params[name] = int(args[name])
+            if not 1 <= params[name] <= Settings.DERIVATIVE_MAX_SIDE:
+                raise ValueError(f"{name} must be between 1 and {Settings.DERIVATIVE_MAX_SIDE}")
+    if params["format"] is not None and params["format"] not in FORMAT_EXTENSIONS:
+        raise ValueError(f"format must be one of {', '.join(FORMAT_EXTENSIONS)}")
+    return params
+
+def send_derivative(key, download_name, params):
+    """Serve a resized/re-encoded copy of ``key`` from the derivative cache, rendering it on a miss."""
+    storage = get_storage()
+    cache = get_derivative_cache()
+    spec = TransformSpec(grayscale=False, format=params["format"])
+    source_ext = os.path.splitext(key)[1]
+    ext = output_ext(spec, source_ext)
+    etag = cache.key(result_cache.source_digest(key), {**params, "quality": spec.quality})
+    headers = {"Cache-Control": f"public, max-age={Settings.DOWNLOAD_MAX_AGE}, immutable"}
+
+    if etag in request.if_none_match:
+        response = Response(status=304, headers=headers)
+        response.set_etag(etag)
+        return response
+
+    def build():
+        with storage.open(key) as source:
+            return render(source, spec, source_ext, box=(params["w"], params["h"]))[0]
+
+    path, hit = cache.get_or_create(etag, ext, build)
+    stem = os.path.splitext(download_name)[0]
+    size = f"{params['w'] or ''}x{params['h'] or ''}"
+    response = send_file(path, as_attachment=True, download_name=f"{stem}_{size}{ext}", etag=etag, conditional=True)
+    response.headers.update(headers)
+    response.headers["X-Cache"] = "HIT" if hit else "MISS"
+    return response
+
+@bp.route("/jobs/status:batch", methods=["POST"])
+def jobs_status_batch():
+    """
+    Get the status of many jobs in one request
+    ---
+    tags:
+      - Jobs
+    parameters:
+      - in: body
+        name: body
+        schema:
+          type: object
+          properties:
+            job_ids:
+              type: array
+              items:
+                type: string
+    responses:
+      200:
+        description: Status of found jobs and the IDs that were not found
+      400:
+        description: Missing, malformed or too many job IDs
+    """
+    data = request.get_json(silent=True)
+    job_ids = data.get("job_ids") if isinstance(data, dict) else None
+    if not isinstance(job_ids, list) or not job_ids:
+        return jsonify({"error": "job_ids_required"}), 400
+    if not all(isinstance(job_id, str) and job_id for job_id in job_ids):
+        return jsonify({"error": "invalid_job_ids"}), 400
+    if len(job_ids) > Settings.JOB_BATCH_MAX_IDS:
+        return jsonify({"error": "too_many_ids", "max": Settings.JOB_BATCH_MAX_IDS}), 400
+
+    jobs = {job["job_id"]: serialize_job(job)
+            for job in current_app.jobs.find({"job_id": {"$in": job_ids}}, STATUS_PROJECTION)}
+    return jsonify({
+        "jobs": [jobs[job_id] for job_id in job_ids if job_id in jobs],
+        "missing": [job_id for job_id in job_ids if job_id not in jobs]
+    })
+
+@bp.route("/jobs", methods=["GET"])
+def list_jobs():
+    """
+    List jobs, newest first, with cursor pagination
+    ---
+    tags:
+      - Jobs
+    parameters:
+      - name: status
+        in: query
+        type: string
+      - name: type
+        in: query
+        type: string
+      - name: since
+        in: query
+        type: string
+        description: ISO 8601 lower bound on updated_at
+      - name: until
+        in: query
+        type: string
+        description: ISO 8601 upper bound on updated_at
+      - name: limit
+        in: query
+        type: integer
+        minimum: 1
+      - name: cursor
+        in: query
+        type: string
+        description: next_cursor from the previous page
+    responses:
+      200:
+        description: A page of jobs and the cursor for the next page
+      400:
+        description: Invalid filter or cursor
+    """
+    query = {}
+    for field in ("status", "type"):
+        if request.args.get(field):
+            query[field] = request.args[field]
+
+    try:
+        limit = min(int(request.args.get("limit", 50)), Settings.JOB_LIST_MAX_LIMIT)
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        updated_at = {}
+        if request.args.get("since"):
+            updated_at["$gte"] = datetime.fromisoformat(request.args["since"])
+        if request.args.get("until"):
+            updated_at["$lt"] = datetime.fromisoformat(request.args["until"])
+        if updated_at:
+            query["updated_at"] = updated_at
+        if request.args.get("cursor"):
+            cursor_updated_at, cursor_job_id = decode_cursor(request.args["cursor"])
+            query["$or"] = [
+                {"updated_at": {"$lt": cursor_updated_at}},
+                {"updated_at": cursor_updated_at, "job_id": {"$lt": cursor_job_id}}
+            ]
+    except (ValueError, KeyError) as e:
+        return jsonify({"error": "invalid_query", "detail": str(e)}), 400
+
+    jobs = list(current_app.jobs.find(query, STATUS_PROJECTION)
+                .sort([("updated_at", -1), ("job_id", -1)])
+                .limit(limit + 1))
+
+    next_cursor = encode_cursor(jobs[limit - 1]) if len(jobs) > limit else None
+    return jsonify({"jobs": [serialize_job(job) for job in jobs[:limit]], "next_cursor": next_cursor})
 
 @bp.route("/jobs/<job_id>", methods=["GET"])
 def job_status(job_id):
@@ -40,8 +260,6 @@ def job_status(job_id):
     if not job:
         return jsonify({"error": "not_found"}), 404
 
-    normalize_datetime_fields(job)
-
     if "processed_files" in job and job["processed_files"]:
         job["processed_files"] = [ProcessedFile(**f).dict() for f in job["processed_files"]]
 
@@ -69,15 +287,55 @@ def job_download(job_id):
         required: false
         type: integer
         description: Index of processed image (default 0, only for multi-file jobs)
+      - name: w
+        in: query
+        required: false
+        type: integer
+        description: Resize to fit this width (derivative, cached)
+      - name: h
+        in: query
+        required: false
+        type: integer
+        description: Resize to fit this height (derivative, cached)
+      - name: format
+        in: query
+        required: false
+        type: string
+        enum: [webp, jpeg, png]
+        description: Re-encode the derivative in this format
     responses:
       200:
-        description: File ready for download
+        description: File ready for download (strong ETag, Range supported, X-Cache on derivatives)
+      400:
+        description: Invalid w, h or format
+      422:
+        description: Output could not be rendered as a derivative
+      206:
+        description: Partial content for a Range request
+      304:
+        description: Not modified (If-None-Match matched the content hash)
       409:
         description: Job not ready or no file
       404:
         description: Job not found
     """
-    job = current_app.jobs.find_one({"job_id": job_id})
+    try:
+        params = derivative_params(request.args)
+    except ValueError as e:
+        return jsonify({"error": "invalid_derivative", "detail": str(e)}), 400
+
+    def serve(key, download_name):
+        if params is None:
+            return send_stored_file(key, download_name)
+        try:
+            return send_derivative(key, download_name, params)
+        except (ImageTooLarge, UnidentifiedImageError) as e:
+            return jsonify({"error": "cannot_render", "detail": str(e)}), 422
+
+    index = max(0, int(request.args.get("index", 0)))
+    # Fetch only the requested entry: batch jobs can carry thousands of processed files.
+    projection = {**DOWNLOAD_PROJECTION, "processed_files": {"$slice": [index, 1]}}
+    job = current_app.jobs.find_one({"job_id": job_id}, projection)
     if not job:
         return jsonify({"error": "not_found"}), 404
     if job.get("status") != "ready":
@@ -85,13 +343,157 @@ def job_download(job_id):
 
     files = job.get("processed_files")
     if files:
-        index = int(request.args.get("index", 0))
-        if index >= len(files):
-            return jsonify({"error": "invalid_index"}), 409
-        file_info = files[index]
-        return send_file(file_info["file_path"], as_attachment=True, download_name=file_info["filename"])
+        file_info = files[0]
+        return serve(file_info["file_path"], file_info["filename"])
+    if index > 0 and "file_path" not in job:
+        return jsonify({"error": "invalid_index"}), 409
 
     if "file_path" in job and "filename" in job:
-        return send_file(job["file_path"], as_attachment=True, download_name=job["filename"])
+        return serve(job["file_path"], job["filename"])
+
+    return jsonify({"error": "no_file"}), 409
+
+def parse_indices(value, count):
+    """Parse ``0,3,5-9`` into sorted unique indices; ``None`` selects every file."""
+    if not value:
+        return list(range(count))
+    indices = set()
+    for part in value.split(","):
+        first, _, last = part.strip().partition("-")
+        first, last = int(first), int(last or first)
+        # Check bounds before expanding, so a huge range cannot allocate anything.
+        if not 0 <= first <= last < count:
+            raise IndexError("invalid_index")
+        indices.update(range(first, last + 1))
+    return sorted(indices)
+
+def archive_names(files):
+    """Arcnames for ``files``, suffixing repeats so every entry survives extraction."""
+    seen = {}
+    for f in files:
+        name = os.path.basename(f["filename"])
+        stem, ext = os.path.splitext(name)
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        yield (f"{stem}_{count}{ext}" if count else name), f["file_path"]
+
+@bp.route("/jobs/<job_id>/archive", methods=["GET"])
+def job_archive(job_id):
+    """
+    Download all (or selected) processed images as one streamed ZIP
+    ---
+    tags:
+      - Jobs
+    produces:
+      - application/zip
+    parameters:
+      - name: job_id
+        in: path
+        required: true
+        type: string
+      - name: indices
+        in: query
+        required: false
+        type: string
+        description: Comma-separated indices or ranges, e.g. 0,3,5-9 (default all)
+    responses:
+      200:
+        description: ZIP stream (images stored, other files deflated)
+      304:
+        description: Not modified
+      400:
+        description: Invalid indices or index out of range
+      409:
+        description: Job not ready or no files
+      404:
+        description: Job not found
+    """
+    job = current_app.jobs.find_one(
+        {"job_id": job_id},
+        {"_id": 0, "status": 1, "filename": 1, "file_path": 1, "processed_files": 1}
+    )
+    if not job:
+        return jsonify({"error": "not_found"}), 404
+    if job.get("status") != "ready":
+        return jsonify({"error": "not_ready"}), 409
+
+    files = job.get("processed_files") or []
+    if not files and job.get("file_path") and job.get("filename"):
+        files = [{"filename": job["filename"], "file_path": job["file_path"]}]
+    if not files:
+        return jsonify({"error": "no_file"}), 409
+
+    try:
+        selected = [files[i] for i in parse_indices(request.args.get("indices"), len(files))]
+    except ValueError:
+        return jsonify({"error": "invalid_indices"}), 400
+    except IndexError:
+        return jsonify({"error": "invalid_index", "count": len(files)}), 400
 
-    return jsonify({"error": "no_file"}), 409
\ No newline at end of file
+    entries = list(archive_names(selected))
+    etags = [content_etag(key) for _, key in entries]
+    etag = None
+    if all(etags):
+        # Archive bytes are deterministic for a given list of names and contents.
+        etag = hashlib.sha256("\n".join(f"{name}:{tag}" for (name, _), tag in zip(entries, etags)).encode()).hexdigest()
+        if etag in request.if_none_match:
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+    storage = get_storage()
+    response = Response(stream_with_context(zip_stream(entries, storage.open)), mimetype="application/zip")
+    response.headers.set("Content-Disposition", "attachment", filename=f"{job_id}.zip")
+    response.headers["X-Accel-Buffering"] = "no"
+    if etag:
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = f"public, max-age={Settings.DOWNLOAD_MAX_AGE}, immutable"
+    return response
+
+@bp.route("/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id):
+    """
+    Stream job status events (SSE) until the job is ready or failed
+    ---
+    tags:
+      - Jobs
+    produces:
+      - text/event-stream
+    parameters:
+      - name: job_id
+        in: path
+        required: true
+        type: string
+    responses:
+      200:
+        description: Server-sent status events
+    """
+    return sse_response(stream_job_events(current_app.jobs, [job_id]))
+
+@bp.route("/jobs/events", methods=["GET"])
+def jobs_events():
+    """
+    Stream status events (SSE) for several jobs until all are ready or failed
+    ---
+    tags:
+      - Jobs
+    produces:
+      - text/event-stream
+    parameters:
+      - name: ids
+        in: query
+        required: true
+        type: string
+        description: Comma-separated job IDs
+    responses:
+      200:
+        description: Server-sent status events
+      400:
+        description: Missing, malformed or too many job IDs
+    """
+    job_ids = list(dict.fromkeys(i for i in request.args.get("ids", "").split(",") if i))
+    if not job_ids:
+        return jsonify({"error": "ids_required"}), 400
+    if len(job_ids) > Settings.JOB_EVENTS_MAX_IDS:
+        return jsonify({"error": "too_many_ids", "max": Settings.JOB_EVENTS_MAX_IDS}), 400
+    return sse_response(stream_job_events(current_app.jobs, job_ids))
@@ -0,0 +1,250 @@
+from flask import Blueprint, request, jsonify
+import os, uuid, fcntl, hashlib
+from pydantic import ValidationError
+from werkzeug.http import parse_content_range_header
+from app.schemas import ImageUploadRequest
+from app.tasks.image_tasks import process_image
+from app.settings import Settings
+from app.repositories import job_store, upload_store
+from app.storage import get_storage
+from app.storage.base import CHUNK_SIZE
+from app.request_limits import body_limit
+
+bp = Blueprint("uploads", __name__)
+
+def _session_view(session, offset):
+    return {
+        "upload_id": session["_id"],
+        "filename": session["filename"],
+        "size": session["size"],
+        "offset": offset,
+        "chunk_size": Settings.UPLOAD_CHUNK_SIZE,
+        "expires_at": session["expires_at"].isoformat()
+    }
+
+def _open_part(upload_id):
+    """Open the part file with an exclusive, non-blocking lock so two writers cannot interleave."""
+    part = open(upload_store.part_path(upload_id), "r+b")
+    try:
+        fcntl.flock(part, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        part.close()
+        raise
+    return part
+
+@bp.route("/uploads", methods=["POST"])
+def create_upload():
+    """
+    Start a resumable chunked upload
+    ---
+    tags:
+      - Uploads
+    parameters:
+      - in: body
+        name: body
+        schema:
+          type: object
+          required: [filename, size]
+          properties:
+            filename:
+              type: string
+            size:
+              type: integer
+              description: Total size in bytes
+            transform:
+              $ref: '#/definitions/TransformSpec'
+    responses:
+      201:
+        description: Upload session created; PUT chunks with Content-Range, then finalize
+      400:
+        description: Invalid filename, size or transform
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        upload = ImageUploadRequest(filename=data.get("filename"), transform=data.get("transform"))
+        size = int(data.get("size"))
+    except ValidationError as e:
+        return jsonify({"error": e.errors(include_context=False)}), 400
+    except (TypeError, ValueError):
+        return jsonify({"error": "size_required"}), 400
+    if not 0 < size <= Settings.UPLOAD_MAX_BYTES:
+        return jsonify({"error": "invalid_size", "max": Settings.UPLOAD_MAX_BYTES}), 400
+
+    session = upload_store.create_session(upload.filename, size, upload.transform.model_dump())
+    return jsonify(_session_view(session, 0)), 201
+
+@bp.route("/uploads/<upload_id>", methods=["GET"])
+def upload_status(upload_id):
+    """
+    Get the offset to resume an upload from
+    ---
+    tags:
+      - Uploads
+    parameters:
+      - name: upload_id
+        in: path
+        required: true
+        type: string
+    responses:
+      200:
+        description: Upload session and bytes received so far
+      404:
+        description: Upload not found or expired
+    """
+    session = upload_store.get_session(upload_id)
+    if not session:
+        return jsonify({"error": "not_found"}), 404
+    return jsonify(_session_view(session, upload_store.offset(upload_id)))
+
+@bp.route("/uploads/<upload_id>", methods=["PUT"])
+@body_limit(lambda: Settings.UPLOAD_CHUNK_SIZE)
+def upload_chunk(upload_id):
+    """
+    Append one chunk to an upload
+    ---
+    tags:
+      - Uploads
+    consumes:
+      - application/octet-stream
+    parameters:
+      - name: upload_id
+        in: path
+        required: true
+        type: string
+      - name: Content-Range
+        in: header
+        required: true
+        type: string
+        description: bytes start-end/size; start must equal the current offset
+      - name: X-Chunk-SHA256
+        in: header
+        required: false
+        type: string
+        description: Hex sha256 of the chunk; a mismatch discards it
+    responses:
+      200:
+        description: Chunk stored; returns the new offset
+      400:
+        description: Invalid Content-Range, short body or checksum mismatch
+      404:
+        description: Upload not found or expired
+      409:
+        description: Offset mismatch (resume from the returned offset) or upload busy
+      413:
+        description: Chunk larger than UPLOAD_CHUNK_SIZE
+    """
+    session = upload_store.get_session(upload_id)
+    if not session:
+        return jsonify({"error": "not_found"}), 404
+
+    content_range = parse_content_range_header(request.headers.get("Content-Range"))
+    if content_range is None or content_range.units != "bytes" or content_range.length != session["size"]:
+        return jsonify({"error": "invalid_content_range"}), 400
+    start, stop = content_range.start, content_range.stop
+    if stop - start > Settings.UPLOAD_CHUNK_SIZE:
+        return jsonify({"error": "chunk_too_large", "max": Settings.UPLOAD_CHUNK_SIZE}), 413
+    if request.content_length != stop - start:
+        return jsonify({"error": "content_length_mismatch"}), 400
+
+    try:
+        part = _open_part(upload_id)
+    except FileNotFoundError:
+        upload_store.delete_session(upload_id)
+        return jsonify({"error": "not_found"}), 404
+    except BlockingIOError:
+        return jsonify({"error": "upload_busy", "offset": upload_store.offset(upload_id)}), 409
+
+    with part:
+        offset = os.fstat(part.fileno()).st_size
+        if start != offset:
+            return jsonify({"error": "offset_mismatch", "offset": offset}), 409
+
+        part.seek(start)
+        digest = hashlib.sha256()
+        received = 0
+        try:
+            for chunk in iter(lambda: request.stream.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                part.write(chunk)
+                received += len(chunk)
+        except BaseException:
+            # A dropped connection leaves the offset at the last complete chunk.
+            part.truncate(start)
+            raise
+
+        expected = request.headers.get("X-Chunk-SHA256")
+        if received != stop - start or (expected and expected.lower() != digest.hexdigest()):
+            part.truncate(start)
+            return jsonify({"error": "chunk_mismatch", "offset": start}), 400
+        part.flush()
+
+    upload_store.touch(upload_id)
+    return jsonify({"upload_id": upload_id, "offset": stop, "size": session["size"]})
+
+@bp.route("/uploads/<upload_id>:finalize", methods=["POST"])
+def finalize_upload(upload_id):
+    """
+    Finish an upload and queue the image job
+    ---
+    tags:
+      - Uploads
+    parameters:
+      - name: upload_id
+        in: path
+        required: true
+        type: string
+    responses:
+      202:
+        description: Image job created
+      404:
+        description: Upload not found or expired
+      409:
+        description: Upload incomplete or busy
+    """
+    session = upload_store.get_session(upload_id)
+    if not session:
+        return jsonify({"error": "not_found"}), 404
+
+    try:
+        part = _open_part(upload_id)
+    except FileNotFoundError:
+        upload_store.delete_session(upload_id)
+        return jsonify({"error": "not_found"}), 404
+    except BlockingIOError:
+        return jsonify({"error": "upload_busy"}), 409
+
+    with part:
+        offset = os.fstat(part.fileno()).st_size
+        if offset != session["size"]:
+            return jsonify({"error": "incomplete", "offset": offset, "size": session["size"]}), 409
+        filepath = get_storage().adopt_file(part.name, os.path.splitext(session["filename"])[1])
+    upload_store.delete_session(upload_id, remove_part=False)
+
+    job_id = str(uuid.uuid4())
+    job_store.create_job(job_id, "image", {
+        "filename": session["filename"],
+        "file_path": filepath,
+        "transform": session["transform"]
+    })
+    process_image.delay(job_id, session["filename"], filepath, session["transform"])
+
+    return jsonify({"job_id": job_id, "status": "queued"}), 202
+
+@bp.route("/uploads/<upload_id>", methods=["DELETE"])
+def abort_upload(upload_id):
+    """
+    Abort an upload and discard its bytes
+    ---
+    tags:
+      - Uploads
+    parameters:
+      - name: upload_id
+        in: path
+        required: true
+        type: string
+    responses:
+      204:
+        description: Upload discarded
+    """
+    upload_store.delete_session(upload_id)
+    return "", 204
@@ -1,13 +1,41 @@
-from pydantic import BaseModel, HttpUrl, Field
-from typing import Optional, List
+import json
+from pydantic import BaseModel, HttpUrl, Field, field_validator
+from typing import Optional, List, Literal
 from datetime import datetime
 
+class TransformSpec(BaseModel):
+    """Declarative image transform, applied in one pass over the decoded image."""
+    grayscale: bool = True
+    max_dimension: Optional[int] = Field(default=None, ge=1, le=20000)
+    thumbnail: Optional[int] = Field(default=None, ge=16, le=2048)
+    format: Optional[Literal["webp", "jpeg", "png"]] = None
+    quality: int = Field(default=80, ge=1, le=100)
+    progressive: bool = False
+
+def _parse_transform(value):
+    # Multipart forms carry the spec as a JSON string.
+    if isinstance(value, str):
+        return json.loads(value) if value.strip() else None
+    return value
+
 class ImageUploadRequest(BaseModel):
     filename: str = Field(min_length=1)
+    transform: TransformSpec = Field(default_factory=TransformSpec)
+
+    @field_validator("transform", mode="before")
+    @classmethod
+    def parse_transform(cls, value):
+        return _parse_transform(value) or TransformSpec()
 
 class ParseJobRequest(BaseModel):
     url: HttpUrl
     limit: Optional[int] = Field(default=5, ge=1, le=100)
+    transform: TransformSpec = Field(default_factory=lambda: TransformSpec(format="webp"))
+
+    @field_validator("transform", mode="before")
+    @classmethod
+    def parse_transform(cls, value):
+        return _parse_transform(value) or TransformSpec(format="webp")
 
 class ProcessedFile(BaseModel):
     filename: str
@@ -1,4 +1,5 @@
 import os
+import json
 import logging
 from logging.handlers import RotatingFileHandler
 from celery.schedules import crontab
@@ -14,9 +15,97 @@ class Settings:
     MONGO_URI = os.getenv("MONGO_URI")
     MONGO_DB_NAME = "flask_jobs"
     MONGO_COLLECTION_NAME = "jobs"
+    MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+    RESULT_CACHE_COLLECTION = os.getenv("RESULT_CACHE_COLLECTION", "image_results")
+    RESULT_CACHE_TTL_DAYS = int(os.getenv("RESULT_CACHE_TTL_DAYS", "30"))
+    UPLOAD_SESSION_COLLECTION = os.getenv("UPLOAD_SESSION_COLLECTION", "upload_sessions")
+    JOB_BATCH_MAX_IDS = int(os.getenv("JOB_BATCH_MAX_IDS", "1000"))
+    JOB_LIST_MAX_LIMIT = int(os.getenv("JOB_LIST_MAX_LIMIT", "200"))
 
     # Files
     FILE_OUTPUT_DIR = os.getenv("FILE_OUTPUT_DIR", "./output")
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+    S3_BUCKET = os.getenv("S3_BUCKET", "flask-jobs")
+    S3_PREFIX = os.getenv("S3_PREFIX", "")
+    S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+    S3_REGION = os.getenv("S3_REGION")
+
+    # Uploads
+    MAX_CONTENT_LENGTH = int(os.getenv("MAX_CONTENT_LENGTH", str(64 * 1024 ** 2)))
+    UPLOAD_DIR = os.getenv("UPLOAD_DIR", os.path.join(FILE_OUTPUT_DIR, ".uploads"))
+    UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(8 * 1024 ** 2)))
+    UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(256 * 1024 ** 2)))
+    UPLOAD_SESSION_TTL = int(os.getenv("UPLOAD_SESSION_TTL", str(24 * 3600)))
+
+    # Downloads
+    DOWNLOAD_MAX_AGE = int(os.getenv("DOWNLOAD_MAX_AGE", str(365 * 24 * 3600)))
+    # "x-accel" (nginx) or "x-sendfile" (Apache/lighttpd): the front proxy streams local files.
+    DOWNLOAD_OFFLOAD = os.getenv("DOWNLOAD_OFFLOAD", "")
+    DOWNLOAD_ACCEL_PREFIX = os.getenv("DOWNLOAD_ACCEL_PREFIX", "/protected-output/")
+    DERIVATIVE_CACHE_DIR = os.getenv("DERIVATIVE_CACHE_DIR", os.path.join(FILE_OUTPUT_DIR, ".derivatives"))
+    DERIVATIVE_CACHE_MAX_BYTES = int(os.getenv("DERIVATIVE_CACHE_MAX_BYTES", str(1024 ** 3)))
+    DERIVATIVE_MAX_SIDE = int(os.getenv("DERIVATIVE_MAX_SIDE", "4096"))
+
+    # Batches
+    BATCH_MAX_FILES = int(os.getenv("BATCH_MAX_FILES", "1000"))
+    # Also the request body limit of /jobs/image:batch, which is exempt from MAX_CONTENT_LENGTH.
+    BATCH_MAX_BYTES = int(os.getenv("BATCH_MAX_BYTES", str(2 * 1024 ** 3)))
+    BATCH_CHUNKS = int(os.getenv("BATCH_CHUNKS", str(os.cpu_count() or 4)))
+
+    # Image decoding limits
+    IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", "250000000"))
+    IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(256 * 1024 ** 2)))
+    IMAGE_MAX_SIDE = int(os.getenv("IMAGE_MAX_SIDE", "0"))
+
+    # Retention
+    JOB_RETENTION_DAYS = {
+        "default": 14,
+        "image": 7,
+        "convert": 7,
+        "parse": 3,
+        "image_batch": 7,
+        **json.loads(os.getenv("JOB_RETENTION_DAYS", "{}"))
+    }
+    GC_GRACE_SECONDS = int(os.getenv("GC_GRACE_SECONDS", "3600"))
+    GC_BATCH_SIZE = int(os.getenv("GC_BATCH_SIZE", "500"))
+    GC_BATCH_PAUSE = float(os.getenv("GC_BATCH_PAUSE", "0.5"))
+    GC_MAX_FILES_PER_RUN = int(os.getenv("GC_MAX_FILES_PER_RUN", "50000"))
+    GC_CURSOR_KEY = os.getenv("GC_CURSOR_KEY", "gc:output_files:cursor")
+
+    # Embeddings
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "models/gemini-embedding-001")
+    EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", "3072"))
+    EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+    EMBEDDING_CACHE_REDIS = os.getenv("EMBEDDING_CACHE_REDIS", "true").lower() == "true"
+    EMBEDDING_CACHE_TTL = int(os.getenv("EMBEDDING_CACHE_TTL", str(30 * 24 * 3600)))
+
+    # RAG
+    RAG_ANSWER_CACHE_SIZE = int(os.getenv("RAG_ANSWER_CACHE_SIZE", "512"))
+    RAG_ANSWER_CACHE_THRESHOLD = float(os.getenv("RAG_ANSWER_CACHE_THRESHOLD", "0.95"))
+
+    # Vector store
+    VECTOR_STORE_DIR = os.getenv("VECTOR_STORE_DIR", "./vectorstore")
+    VECTOR_SNAPSHOT_INTERVAL = int(os.getenv("VECTOR_SNAPSHOT_INTERVAL", "300"))
+    # Read-only replicas only: faiss maps IVF inverted lists read-only, so adds to a
+    # mapped IVF index fail; Flat/HNSW indexes are copied into memory regardless.
+    VECTOR_STORE_MMAP = os.getenv("VECTOR_STORE_MMAP", "false").lower() == "true"
+    VECTOR_SNAPSHOTS_KEPT = int(os.getenv("VECTOR_SNAPSHOTS_KEPT", "2"))
+    VECTOR_INDEX_TIER = os.getenv("VECTOR_INDEX_TIER", "ivf")
+    VECTOR_INDEX_THRESHOLD = int(os.getenv("VECTOR_INDEX_THRESHOLD", "50000"))
+    VECTOR_IVF_NLIST = int(os.getenv("VECTOR_IVF_NLIST", "0"))
+    VECTOR_TRAIN_POINTS_PER_LIST = int(os.getenv("VECTOR_TRAIN_POINTS_PER_LIST", "64"))
+    VECTOR_HNSW_M = int(os.getenv("VECTOR_HNSW_M", "32"))
+    VECTOR_DEFAULT_NPROBE = int(os.getenv("VECTOR_DEFAULT_NPROBE", "16"))
+    VECTOR_DEFAULT_EF_SEARCH = int(os.getenv("VECTOR_DEFAULT_EF_SEARCH", "64"))
+    VECTOR_INGEST_BATCH_SIZE = int(os.getenv("VECTOR_INGEST_BATCH_SIZE", "64"))
+    VECTOR_INGEST_MAX_AGE_MS = int(os.getenv("VECTOR_INGEST_MAX_AGE_MS", "200"))
+    VECTOR_SERVICE_URL = os.getenv("VECTOR_SERVICE_URL", "http://vector:8500")
+    VECTOR_SERVICE_TIMEOUT = float(os.getenv("VECTOR_SERVICE_TIMEOUT", "30"))
+    # Required: the vector service refuses to start without it and clients send it as X-Vector-Token.
+    VECTOR_SERVICE_TOKEN = os.getenv("VECTOR_SERVICE_TOKEN")
+    # RAG answers may be served from the cache for up to this long after a vector store write.
+    VECTOR_GENERATION_TTL = float(os.getenv("VECTOR_GENERATION_TTL", "2"))
+    VECTOR_WRITE_BATCH_SIZE = int(os.getenv("VECTOR_WRITE_BATCH_SIZE", "256"))
 
     # SQLAlchemy
     SQLALCHEMY_DATABASE_URI = os.getenv("SQLALCHEMY_DATABASE_URI", "sqlite:///app.db")
@@ -72,10 +161,24 @@ class Settings:
     REDIS_HOST = os.getenv("REDIS_HOST", "redis")
     REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 
+    # Job events
+    JOB_EVENTS_CHANNEL_PREFIX = os.getenv("JOB_EVENTS_CHANNEL_PREFIX", "jobs:")
+    JOB_EVENTS_HEARTBEAT = int(os.getenv("JOB_EVENTS_HEARTBEAT", "15"))
+    JOB_EVENTS_QUEUE_SIZE = int(os.getenv("JOB_EVENTS_QUEUE_SIZE", "256"))
+    JOB_EVENTS_MAX_IDS = int(os.getenv("JOB_EVENTS_MAX_IDS", "500"))
+    JOB_EVENTS_SUBSCRIBE_TIMEOUT = float(os.getenv("JOB_EVENTS_SUBSCRIBE_TIMEOUT", "5"))
+
     # Celery
+    # Prefix of the daily parse job ids (one job per UTC day).
     DAILY_JOB_ID = os.getenv("DAILY_JOB_ID", "job_daily")
     PARSER_URL = os.getenv("PARSER_URL", "https://www.python.org")
     PARSER_LIMIT = int(os.getenv("PARSER_LIMIT", "5"))
+    PARSER_FETCH_CONCURRENCY = int(os.getenv("PARSER_FETCH_CONCURRENCY", "16"))
+    PARSER_FETCH_PER_HOST = int(os.getenv("PARSER_FETCH_PER_HOST", "4"))
+    PARSER_MAX_TRACKED_HOSTS = int(os.getenv("PARSER_MAX_TRACKED_HOSTS", "1024"))
+    HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+    HTTP_CACHE_PREFIX = os.getenv("HTTP_CACHE_PREFIX", "httpcache:")
+    HTTP_CACHE_TTL = int(os.getenv("HTTP_CACHE_TTL", str(30 * 24 * 3600)))
 
     CELERY_CONFIG = {
         "broker_url": REDIS_URL,
@@ -85,9 +188,17 @@ class Settings:
         "accept_content": ["json"],
         "beat_schedule": {
             "parse-page-every-morning": {
-                "task": "tasks.parse_page",
+                "task": "tasks.parse_page_daily",
                 "schedule": crontab(hour=7, minute=0),
-                "args": (DAILY_JOB_ID, PARSER_URL, PARSER_LIMIT),
+                "args": (PARSER_URL, PARSER_LIMIT),
+            },
+            "gc-output-files-hourly": {
+                "task": "tasks.gc_output_files",
+                "schedule": crontab(minute=30),
+            },
+            "gc-upload-sessions-hourly": {
+                "task": "tasks.gc_upload_sessions",
+                "schedule": crontab(minute=45),
             },
         },
     }
@@ -0,0 +1,31 @@
+import os
+from threading import Lock
+from app.settings import Settings
+from .base import StorageBackend, StoredObject, content_key, content_hash, content_etag
+
+_storage: StorageBackend | None = None
+_storage_pid: int | None = None
+_lock = Lock()
+
+def _create_storage() -> StorageBackend:
+    if Settings.STORAGE_BACKEND == "s3":
+        from .s3 import S3Storage
+        return S3Storage(
+            bucket=Settings.S3_BUCKET,
+            prefix=Settings.S3_PREFIX,
+            endpoint_url=Settings.S3_ENDPOINT_URL,
+            region=Settings.S3_REGION
+        )
+    from .local import LocalStorage
+    return LocalStorage(Settings.FILE_OUTPUT_DIR)
+
+def get_storage() -> StorageBackend:
+    global _storage, _storage_pid
+
+    if _storage is None or _storage_pid != os.getpid():
+        with _lock:
+            if _storage is None or _storage_pid != os.getpid():
+                _storage = _create_storage()
+                _storage_pid = os.getpid()
+
+    return _storage
@@ -0,0 +1,99 @@
+import io
+import re
+import hashlib
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator
+
+CHUNK_SIZE = 1024 * 1024
+DIGEST_RE = re.compile(r"[0-9a-f]{64}")
+
+@dataclass
+class StoredObject:
+    key: str
+    size: int
+    mtime: float
+
+def content_key(digest: str, ext: str) -> str:
+    """Shard by the first two hex byte pairs: ``ab/cd/abcd…<ext>``."""
+    return f"{digest[:2]}/{digest[2:4]}/{digest}{ext.lower()}"
+
+def content_hash(key: str) -> str:
+    return os.path.splitext(os.path.basename(key))[0]
+
+def content_etag(key: str) -> str | None:
+    """Strong ETag for content-addressed keys; ``None`` for legacy path keys, whose bytes may change."""
+    digest = content_hash(key)
+    return digest if DIGEST_RE.fullmatch(digest) else None
+
+class StorageBackend(ABC):
+    """Content-addressed blob store; keys are derived from the sha256 of the stored bytes."""
+
+    @abstractmethod
+    def put_stream(self, stream: BinaryIO, ext: str) -> str:
+        ...
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        ...
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def size(self, key: str) -> int:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    def iter_objects(self, start_after: str | None = None) -> Iterator[StoredObject]:
+        """Every stored object in a stable key order, beginning after ``start_after``."""
+
+    @abstractmethod
+    def mtime(self, key: str) -> float | None:
+        """Current modification time, or ``None`` if ``key`` is gone."""
+
+    def touch(self, key: str) -> bool:
+        """Refresh ``key``'s modification time so GC's grace period restarts; ``False`` if it is gone."""
+        return self.exists(key)
+
+    def local_path(self, key: str) -> str | None:
+        return None
+
+    def aliases(self, key: str) -> list[str]:
+        return [key]
+
+    def put_bytes(self, data: bytes, ext: str) -> str:
+        return self.put_stream(io.BytesIO(data), ext)
+
+    def put_path(self, path: str, ext: str | None = None) -> str:
+        with open(path, "rb") as f:
+            return self.put_stream(f, ext if ext is not None else os.path.splitext(path)[1])
+
+    def adopt_file(self, path: str, ext: str) -> str:
+        """Store a scratch file the caller no longer needs; backends may move it instead of copying."""
+        key = self.put_path(path, ext)
+        os.remove(path)
+        return key
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def copy_hashing(stream: BinaryIO, target: BinaryIO) -> str:
+    digest = hashlib.sha256()
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+        target.write(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,120 @@
+import os
+import time
+import json
+import fcntl
+import hashlib
+import logging
+import tempfile
+from threading import Lock
+from typing import Callable
+from app.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+_cache = None
+_cache_pid: int | None = None
+_lock = Lock()
+
+class DerivativeCache:
+    """Size-bounded LRU of rendered derivatives on local disk, keyed by ``(content hash, params)``.
+
+    Recency is the file mtime, bumped on every hit. Renders are serialised per shard
+    directory with ``flock`` so concurrent requests, in any worker process, produce a key once.
+    """
+
+    def __init__(self, root: str, max_bytes: int, evict_interval: float = 60, evict_grace: float = 60):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.evict_interval = evict_interval
+        self.evict_grace = evict_grace
+        self._last_evict = 0.0
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def key(digest: str, params: dict) -> str:
+        return hashlib.sha256(f"{digest}:{json.dumps(params, sort_keys=True)}".encode()).hexdigest()
+
+    def path(self, key: str, ext: str) -> str:
+        return os.path.join(self.root, key[:2], key[2:4], f"{key}{ext}")
+
+    @staticmethod
+    def _touch(path: str) -> bool:
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def get_or_create(self, key: str, ext: str, render: Callable[[], bytes]) -> tuple[str, bool]:
+        """Return ``(path, hit)``, rendering on a miss."""
+        path = self.path(key, ext)
+        if self._touch(path):
+            return path, True
+
+        shard = os.path.dirname(path)
+        os.makedirs(shard, exist_ok=True)
+        # One long-lived lock file per shard: unlinking a lock others wait on would let a
+        # newcomer lock a fresh inode and render concurrently. Shards bound the file count.
+        with open(os.path.join(shard, ".lock"), "a+b") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if self._touch(path):
+                # Another request rendered it while we waited.
+                return path, True
+            fd, tmp_path = tempfile.mkstemp(dir=shard, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as tmp:
+                    tmp.write(render())
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+        self._maybe_evict()
+        return path, False
+
+    def _maybe_evict(self):
+        now = time.monotonic()
+        if now - self._last_evict < self.evict_interval:
+            return
+        self._last_evict = now
+
+        entries, total = [], 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith((".lock", ".tmp")):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(dirpath, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(dirpath, name)))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return
+
+        # Trim to 90% so eviction is not re-run on every miss; skip files that may be mid-send.
+        target = self.max_bytes * 0.9
+        cutoff = time.time() - self.evict_grace
+        evicted = 0
+        for mtime, size, path in sorted(entries):
+            if total <= target or mtime > cutoff:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                evicted += 1
+            except FileNotFoundError:
+                continue
+        logger.info(f"Derivative cache evicted {evicted} files, {total} bytes remain")
+
+def get_derivative_cache() -> DerivativeCache:
+    global _cache, _cache_pid
+
+    if _cache is None or _cache_pid != os.getpid():
+        with _lock:
+            if _cache is None or _cache_pid != os.getpid():
+                _cache = DerivativeCache(Settings.DERIVATIVE_CACHE_DIR, Settings.DERIVATIVE_CACHE_MAX_BYTES)
+                _cache_pid = os.getpid()
+
+    return _cache
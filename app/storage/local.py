@@ -0,0 +1,112 @@
+import os
+import tempfile
+from typing import BinaryIO, Iterator
+from .base import StorageBackend, StoredObject, content_key, copy_hashing, file_hash
+
+class LocalStorage(StorageBackend):
+    def __init__(self, root: str):
+        self.root = root
+        self.tmp_dir = os.path.join(root, ".tmp")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        # Jobs written before the storage layer hold full paths under the output dir.
+        if os.path.isabs(key) or key.startswith(self.root.rstrip("/") + "/"):
+            return key
+        return os.path.join(self.root, key)
+
+    def put_stream(self, stream: BinaryIO, ext: str) -> str:
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                digest = copy_hashing(stream, tmp)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+
+            key = content_key(digest, ext)
+            path = self._path(key)
+            if self.touch(key):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+            return key
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def adopt_file(self, path: str, ext: str) -> str:
+        key = content_key(file_hash(path), ext)
+        target = self._path(key)
+        if self.touch(key):
+            os.remove(path)
+            return key
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        try:
+            os.replace(path, target)
+        except OSError:
+            # Scratch dir on another filesystem: fall back to copying.
+            return super().adopt_file(path, ext)
+        return key
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self._path(key), "rb")
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def size(self, key: str) -> int:
+        return os.path.getsize(self._path(key))
+
+    def mtime(self, key: str) -> float | None:
+        try:
+            return os.path.getmtime(self._path(key))
+        except FileNotFoundError:
+            return None
+
+    def touch(self, key: str) -> bool:
+        try:
+            os.utime(self._path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def local_path(self, key: str) -> str | None:
+        return self._path(key)
+
+    def aliases(self, key: str) -> list[str]:
+        return [key, os.path.join(self.root, key)]
+
+    def iter_objects(self, start_after: str | None = None) -> Iterator[StoredObject]:
+        # Sorted per directory and compared by path components, so a run can resume where the last stopped.
+        yield from self._walk(self.root, [], start_after.split("/") if start_after else None)
+
+    def _walk(self, path: str, parts: list[str], after: list[str] | None) -> Iterator[StoredObject]:
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            entry_parts = parts + [entry.name]
+            if entry.is_dir(follow_symlinks=False):
+                if after and entry_parts < after[:len(entry_parts)]:
+                    continue
+                yield from self._walk(entry.path, entry_parts, after)
+            elif entry.is_file(follow_symlinks=False):
+                if after and entry_parts <= after:
+                    continue
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                yield StoredObject("/".join(entry_parts), stat.st_size, stat.st_mtime)
@@ -0,0 +1,84 @@
+import tempfile
+from typing import BinaryIO, Iterator
+from .base import StorageBackend, StoredObject, content_key, copy_hashing
+
+try:
+    import boto3
+    from botocore.exceptions import ClientError
+except ImportError:
+    boto3 = None
+
+class S3Storage(StorageBackend):
+    """S3-compatible backend; point ``endpoint_url`` at MinIO or another stand-in for local runs."""
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: str | None = None, region: str | None = None):
+        if boto3 is None:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires boto3 to be installed")
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix else ""
+        self.client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def put_stream(self, stream: BinaryIO, ext: str) -> str:
+        # The key depends on the digest, so spool to disk first instead of buffering in memory.
+        with tempfile.TemporaryFile() as spool:
+            key = content_key(copy_hashing(stream, spool), ext)
+            if not self.touch(key):
+                spool.seek(0)
+                self.client.upload_fileobj(spool, self.bucket, self._object_key(key))
+        return key
+
+    def open(self, key: str) -> BinaryIO:
+        return self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))["Body"]
+
+    @staticmethod
+    def _missing(error: ClientError) -> bool:
+        return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+            return True
+        except ClientError as e:
+            if self._missing(e):
+                return False
+            raise
+
+    def mtime(self, key: str) -> float | None:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))["LastModified"].timestamp()
+        except ClientError as e:
+            if self._missing(e):
+                return None
+            raise
+
+    def touch(self, key: str) -> bool:
+        # S3 has no utime; copying an object onto itself (metadata must be replaced) resets LastModified.
+        object_key = self._object_key(key)
+        try:
+            self.client.copy_object(
+                Bucket=self.bucket,
+                Key=object_key,
+                CopySource={"Bucket": self.bucket, "Key": object_key},
+                MetadataDirective="REPLACE"
+            )
+            return True
+        except ClientError as e:
+            if self._missing(e):
+                return False
+            raise
+
+    def size(self, key: str) -> int:
+        return self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))["ContentLength"]
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+    def iter_objects(self, start_after: str | None = None) -> Iterator[StoredObject]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        kwargs = {"StartAfter": self._object_key(start_after)} if start_after else {}
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix, **kwargs):
+            for obj in page.get("Contents", []):
+                yield StoredObject(obj["Key"][len(self.prefix):], obj["Size"], obj["LastModified"].timestamp())
@@ -0,0 +1,77 @@
+import io
+import json
+import os
+import logging
+import zipfile
+from flask import Response, request, stream_with_context
+
+logger = logging.getLogger(__name__)
+
+# Already-compressed formats gain nothing from deflate; storing them keeps the CPU cost at zero.
+STORED_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".zip", ".gz"}
+ZIP_CHUNK_SIZE = 256 * 1024
+
+def wants_event_stream() -> bool:
+    return request.accept_mimetypes.best == "text/event-stream"
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def sse_response(events) -> Response:
+    """Wrap an iterable of ``(event, data)`` pairs as a ``text/event-stream`` response."""
+    def generate():
+        try:
+            for event, data in events:
+                yield sse_event(event, data)
+        except Exception as e:
+            yield sse_event("error", {"error": str(e)})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+class _ZipSink(io.RawIOBase):
+    """Unseekable write target, so ``zipfile`` emits data descriptors instead of seeking back."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self):
+        # Never yield an empty body chunk: some servers read it as the end of a chunked response.
+        if self._chunks:
+            data = b"".join(self._chunks)
+            self._chunks.clear()
+            yield data
+
+def zip_stream(entries, open_entry):
+    """Yield a ZIP archive of ``(arcname, key)`` entries chunk by chunk.
+
+    Memory stays at one read chunk regardless of archive size. Timestamps are fixed,
+    so the same entries always produce the same bytes.
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w", allowZip64=True) as zf:
+        for arcname, key in entries:
+            info = zipfile.ZipInfo(arcname, date_time=(1980, 1, 1, 0, 0, 0))
+            stored = os.path.splitext(arcname)[1].lower() in STORED_EXTENSIONS
+            info.compress_type = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+            try:
+                source = open_entry(key)
+            except FileNotFoundError:
+                logger.warning(f"Skipping missing archive entry {key}")
+                continue
+            with source, zf.open(info, "w") as target:
+                for chunk in iter(lambda: source.read(ZIP_CHUNK_SIZE), b""):
+                    target.write(chunk)
+                    yield from sink.drain()
+            yield from sink.drain()
+    yield from sink.drain()
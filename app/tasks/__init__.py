@@ -1,2 +1,3 @@
-from .parser_tasks import parse_page
-from .image_tasks import process_image
\ No newline at end of file
+from .parser_tasks import parse_page, parse_page_daily
+from .image_tasks import process_image
+from .maintenance_tasks import gc_output_files, gc_upload_sessions
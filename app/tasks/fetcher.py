@@ -0,0 +1,156 @@
+import os
+import time
+import hashlib
+import logging
+import requests
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from email.message import Message
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import BoundedSemaphore, Lock
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from app.settings import Settings
+from app.tasks import http_cache
+
+logger = logging.getLogger(__name__)
+
+_session: requests.Session | None = None
+_session_pid: int | None = None
+_lock = Lock()
+
+PAGE_CHUNK_SIZE = 16 * 1024
+
+def get_session() -> requests.Session:
+    global _session, _session_pid
+
+    if _session is None or _session_pid != os.getpid():
+        with _lock:
+            if _session is None or _session_pid != os.getpid():
+                adapter = HTTPAdapter(
+                    pool_connections=Settings.PARSER_FETCH_CONCURRENCY,
+                    pool_maxsize=Settings.PARSER_FETCH_CONCURRENCY
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+                _session_pid = os.getpid()
+
+    return _session
+
+class HostLimiter:
+    """Per-host concurrency limits; idle hosts are pruned so a long-lived worker's table stays bounded."""
+
+    def __init__(self, per_host: int, max_hosts: int):
+        self.per_host = per_host
+        self.max_hosts = max_hosts
+        self._hosts: OrderedDict = OrderedDict()  # netloc -> [semaphore, in-flight count]
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._hosts)
+
+    def _prune(self):
+        excess = len(self._hosts) - self.max_hosts
+        for host in list(self._hosts):
+            if excess <= 0:
+                break
+            # Hosts with requests in flight keep their semaphore, or the limit could be exceeded.
+            if self._hosts[host][1] == 0:
+                del self._hosts[host]
+                excess -= 1
+
+    @contextmanager
+    def limit(self, url: str):
+        host = urlsplit(url).netloc
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None:
+                entry = self._hosts[host] = [BoundedSemaphore(self.per_host), 0]
+            self._hosts.move_to_end(host)
+            entry[1] += 1
+            self._prune()
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+
+_host_limiter = HostLimiter(Settings.PARSER_FETCH_PER_HOST, Settings.PARSER_MAX_TRACKED_HOSTS)
+
+def _host_limit(url: str):
+    return _host_limiter.limit(url)
+
+@dataclass
+class FetchResult:
+    content: bytes | None
+    digest: str
+    size: int
+    not_modified: bool = False
+    finished_at: float = field(default_factory=time.perf_counter)
+
+def fetch(url: str, timeout: float = 5, conditional: bool = True) -> FetchResult:
+    """GET ``url``, revalidating against the HTTP cache; ``content`` is ``None`` on a 304."""
+    entry = http_cache.get_validators(url) if conditional else None
+    with _host_limit(url):
+        response = get_session().get(url, timeout=timeout, headers=http_cache.conditional_headers(entry))
+        if response.status_code == 304 and entry:
+            return FetchResult(None, entry["digest"], entry["size"], not_modified=True)
+        response.raise_for_status()
+        content = response.content
+
+    digest = hashlib.sha256(content).hexdigest()
+    http_cache.store_validators(url, response.headers, digest, len(content))
+    return FetchResult(content, digest, len(content))
+
+def declared_charset(headers) -> str | None:
+    """The charset the server actually declared; ``response.encoding`` falls back to
+    ISO-8859-1 for any ``text/*`` without one, which garbles UTF-8 pages."""
+    message = Message()
+    message["Content-Type"] = headers.get("Content-Type", "")
+    return message.get_content_charset()
+
+def fetch_page(url: str, consume, timeout: float = 10, conditional: bool = True):
+    """Stream ``url`` into ``consume(chunks, encoding)``; returns ``(FetchResult, consumed value)``.
+
+    The consumer may stop iterating early, in which case the rest of the body is never read
+    and ``size`` counts only the bytes that were. On a 304 the consumer is not called.
+    """
+    entry = http_cache.get_validators(url) if conditional else None
+    with _host_limit(url), get_session().get(
+        url, timeout=timeout, headers=http_cache.conditional_headers(entry), stream=True
+    ) as response:
+        if response.status_code == 304 and entry:
+            return FetchResult(None, entry["digest"], entry["size"], not_modified=True), None
+        response.raise_for_status()
+
+        digest, size = hashlib.sha256(), 0
+        def chunks():
+            nonlocal size
+            for chunk in response.iter_content(PAGE_CHUNK_SIZE):
+                digest.update(chunk)
+                size += len(chunk)
+                yield chunk
+
+        value = consume(chunks(), declared_charset(response.headers))
+
+    http_cache.store_validators(url, response.headers, digest.hexdigest(), size)
+    return FetchResult(None, digest.hexdigest(), size), value
+
+def fetch_all(urls: list[str], timeout: float = 5):
+    """Download ``urls`` concurrently, yielding ``(index, url, FetchResult, error)`` as each finishes."""
+    if not urls:
+        return
+
+    workers = min(Settings.PARSER_FETCH_CONCURRENCY, len(urls))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fetch") as pool:
+        futures = {pool.submit(fetch, url, timeout): (index, url) for index, url in enumerate(urls)}
+        for future in as_completed(futures):
+            index, url = futures[future]
+            try:
+                yield index, url, future.result(), None
+            except Exception as e:
+                yield index, url, None, e
@@ -0,0 +1,149 @@
+import codecs
+import itertools
+import re
+from html.parser import HTMLParser
+from typing import Iterable
+from urllib.parse import urljoin, urlparse
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+# Lazy loaders keep the real URL in data-* attributes and a placeholder in src/srcset.
+SRCSET_ATTRS = ("data-srcset", "srcset")
+SRC_ATTRS = ("data-src", "data-lazy-src", "data-original", "src")
+
+_DESCRIPTOR_RE = re.compile(r"^(\d+(?:\.\d+)?)([wx])$")
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)""", re.IGNORECASE)
+# The HTML spec only looks for a <meta> charset in the first 1024 bytes.
+SNIFF_BYTES = 1024
+
+def _srcset_candidates(value: str):
+    """``(url, descriptor)`` pairs per the HTML srcset rules: URLs may contain commas
+    (CDN transform paths do), so a candidate ends at the comma after its descriptor."""
+    pos, end = 0, len(value)
+    while True:
+        while pos < end and (value[pos].isspace() or value[pos] == ","):
+            pos += 1
+        if pos >= end:
+            return
+        start = pos
+        while pos < end and not value[pos].isspace():
+            pos += 1
+        url, descriptor = value[start:pos], ""
+        if url.endswith(","):
+            url = url.rstrip(",")
+        else:
+            comma = value.find(",", pos)
+            comma = end if comma == -1 else comma
+            descriptor, pos = value[pos:comma].strip(), comma + 1
+        yield url, descriptor
+
+def best_srcset(value: str) -> str | None:
+    """Highest-resolution URL in a ``srcset`` (largest ``w``, else largest ``x`` descriptor)."""
+    best, best_score = None, (-1, -1.0)
+    for url, descriptor in _srcset_candidates(value):
+        match = _DESCRIPTOR_RE.match(descriptor.split()[0]) if descriptor else None
+        score = (1, float(match.group(1))) if match and match.group(2) == "w" else \
+            (0, float(match.group(1)) if match else 1.0)
+        if score > best_score:
+            best, best_score = url, score
+    return best
+
+def sniff_encoding(head: bytes) -> str | None:
+    """Encoding from a BOM or a ``<meta charset>`` in the first bytes of a document."""
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    match = _META_CHARSET_RE.search(head[:SNIFF_BYTES])
+    return match.group(1).decode("ascii") if match else None
+
+class ImageExtractor(HTMLParser):
+    """Collect absolute raster image URLs in document order, stopping once ``limit`` are found.
+
+    Each ``<img>`` contributes its best candidate; a ``<picture>`` contributes the first
+    valid candidate among its ``<source>`` elements and fallback ``<img>``.
+    """
+
+    def __init__(self, base_url: str, limit: int | None):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.limit = limit
+        self.images: list[str] = []
+        self.done = False
+        self._seen = set()
+        self._picture: list | None = None
+
+    def _resolve(self, url: str | None) -> str | None:
+        if not url or url.startswith("data:"):
+            return None
+        url = urljoin(self.base_url, url.strip())
+        return url if urlparse(url).path.lower().endswith(IMAGE_EXTENSIONS) else None
+
+    def _pick(self, attrs: dict) -> str | None:
+        for name in SRCSET_ATTRS:
+            if attrs.get(name):
+                url = self._resolve(best_srcset(attrs[name]))
+                if url:
+                    return url
+        for name in SRC_ATTRS:
+            url = self._resolve(attrs.get(name))
+            if url:
+                return url
+        return None
+
+    def _add(self, url: str | None):
+        if url and url not in self._seen:
+            self._seen.add(url)
+            self.images.append(url)
+            self.done = self.limit is not None and len(self.images) >= self.limit
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        attrs = dict(attrs)
+        if tag == "base" and attrs.get("href"):
+            self.base_url = urljoin(self.base_url, attrs["href"])
+        elif tag == "picture":
+            self._picture = []
+        elif tag == "source" and self._picture is not None:
+            self._picture.append(self._pick(attrs))
+        elif tag == "img":
+            if self._picture is not None:
+                self._picture.append(self._pick(attrs))
+            else:
+                self._add(self._pick(attrs))
+
+    def handle_endtag(self, tag):
+        if tag == "picture" and self._picture is not None:
+            self._add(next((url for url in self._picture if url), None))
+            self._picture = None
+
+    def close(self):
+        super().close()
+        self.handle_endtag("picture")
+
+def extract_images(chunks: Iterable[bytes], base_url: str, limit: int | None, encoding: str | None = None) -> list[str]:
+    """Feed ``chunks`` to an ``ImageExtractor`` and stop pulling them as soon as ``limit`` images are found.
+
+    ``encoding`` is the charset declared by the server; without one it is sniffed from the
+    document and defaults to UTF-8.
+    """
+    if not encoding:
+        chunks, head = iter(chunks), b""
+        for chunk in chunks:
+            head += chunk
+            if len(head) >= SNIFF_BYTES:
+                break
+        encoding = sniff_encoding(head)
+        chunks = itertools.chain([head], chunks)
+    try:
+        decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    parser = ImageExtractor(base_url, limit)
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk))
+        if parser.done:
+            break
+    else:
+        parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+    return parser.images[:limit]
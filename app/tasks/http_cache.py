@@ -0,0 +1,68 @@
+import os
+import json
+import hashlib
+import logging
+import redis
+from threading import Lock
+from app.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+_redis: redis.Redis | None = None
+_redis_pid: int | None = None
+_lock = Lock()
+
+def get_redis() -> redis.Redis:
+    global _redis, _redis_pid
+
+    if _redis is None or _redis_pid != os.getpid():
+        with _lock:
+            if _redis is None or _redis_pid != os.getpid():
+                _redis = redis.Redis.from_url(Settings.REDIS_URL)
+                _redis_pid = os.getpid()
+
+    return _redis
+
+def _key(kind: str, *parts) -> str:
+    return f"{Settings.HTTP_CACHE_PREFIX}{kind}:{hashlib.sha256('|'.join(map(str, parts)).encode()).hexdigest()}"
+
+def _get(key: str) -> dict | None:
+    if not Settings.HTTP_CACHE_ENABLED:
+        return None
+    try:
+        raw = get_redis().get(key)
+    except redis.RedisError as e:
+        logger.warning(f"HTTP cache read failed: {e}")
+        return None
+    return json.loads(raw) if raw else None
+
+def _set(key: str, value: dict):
+    if not Settings.HTTP_CACHE_ENABLED:
+        return
+    try:
+        get_redis().set(key, json.dumps(value), ex=Settings.HTTP_CACHE_TTL)
+    except redis.RedisError as e:
+        logger.warning(f"HTTP cache write failed: {e}")
+
+def get_validators(url: str) -> dict | None:
+    """``{etag, last_modified, digest, size}`` recorded the last time ``url`` answered 200."""
+    return _get(_key("url", url))
+
+def store_validators(url: str, headers, digest: str, size: int):
+    etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+    if etag or last_modified:
+        _set(_key("url", url), {"etag": etag, "last_modified": last_modified, "digest": digest, "size": size})
+
+def conditional_headers(entry: dict | None) -> dict:
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+def get_page_outputs(url: str, limit: int, params: dict) -> dict | None:
+    return _get(_key("page", url, limit, json.dumps(params, sort_keys=True)))
+
+def store_page_outputs(url: str, limit: int, params: dict, outputs: dict):
+    _set(_key("page", url, limit, json.dumps(params, sort_keys=True)), outputs)
@@ -1,42 +1,206 @@
 import os
+import math
+import time
 import logging
+from io import BytesIO
+from threading import Event, Thread
 from datetime import datetime
-from pymongo import MongoClient
-from PIL import Image
+from PIL import Image, ImageOps
 from celery import shared_task
 
-from app.schemas import JobStatusResponse
+from app.schemas import JobStatusResponse, ProcessedFile, TransformSpec
+from app.repositories import job_store, result_cache
+from app.storage import get_storage
+from app.settings import Settings
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@shared_task(name="tasks.process_image", bind=True)
-def process_image(self, job_id: str, filename: str, filepath: str):
-    client = MongoClient(os.getenv("MONGO_URI"))
-    db = client.get_default_database()
-    jobs = db["jobs"]
-
-    jobs.update_one(
-        {"job_id": job_id},
-        {"$set": {
-            "status": "processing",
-            "progress": 25,
-            "updated_at": datetime.utcnow()
-        }}
-    )
+# Pillow refuses to open anything past twice this; decode_image enforces the limit itself.
+Image.MAX_IMAGE_PIXELS = Settings.IMAGE_MAX_PIXELS
 
-    logger.info(f"[{job_id}] Start processing {filename}")
+class ImageTooLarge(ValueError):
+    pass
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
 
+def current_rss() -> int | None:
     try:
-        img = Image.open(filepath).convert("L")
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+class RssSampler:
+    """Samples RSS while a task runs and reports the peak growth over its starting RSS.
+
+    ``ru_maxrss`` is the worker's lifetime high-water mark, so one huge image would
+    be charged to every task that runs in the same worker after it.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self._stop = Event()
+        self._thread: Thread | None = None
+        self._start = self._peak = None
+
+    def _sample(self):
+        rss = current_rss()
+        if rss is not None and rss > self._peak:
+            self._peak = rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> "RssSampler":
+        self._start = self._peak = current_rss()
+        if self._start is not None:
+            self._thread = Thread(target=self._run, name="rss-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> float | None:
+        """Stop sampling; returns the peak RSS growth in MB, or ``None`` without ``/proc``."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self._sample()
+        if self._start is None:
+            return None
+        return round((self._peak - self._start) / (1024 * 1024), 1)
+
+FORMAT_EXTENSIONS = {"webp": ".webp", "jpeg": ".jpg", "png": ".png"}
+
+def _fit(size: tuple[int, int], box: tuple[int, int] | None) -> tuple[int, int]:
+    if not box:
+        return size
+    scale = min(box[0] / size[0], box[1] / size[1])
+    if scale >= 1:
+        return size
+    return max(1, math.ceil(size[0] * scale)), max(1, math.ceil(size[1] * scale))
+
+def _target_box(size: tuple[int, int], spec: TransformSpec, box: tuple | None) -> tuple[int, int] | None:
+    if box:
+        return box[0] or size[0], box[1] or size[1]
+    max_side = min(filter(None, (spec.max_dimension, Settings.IMAGE_MAX_SIDE)), default=None)
+    return (max_side, max_side) if max_side else None
+
+def _draft_size(size: tuple[int, int], spec: TransformSpec, box: tuple | None) -> tuple[int, int]:
+    if spec.thumbnail:
+        # A centre-cropped square needs both sides to cover the thumbnail.
+        scale = min(1.0, spec.thumbnail / min(size))
+        return max(1, math.ceil(size[0] * scale)), max(1, math.ceil(size[1] * scale))
+    return _fit(size, _target_box(size, spec, box))
+
+def transform_params(spec: TransformSpec, ext: str) -> dict:
+    params = {"op": "transform", "ext": ext.lower(), **spec.model_dump()}
+    if Settings.IMAGE_MAX_SIDE:
+        params["max_side"] = Settings.IMAGE_MAX_SIDE
+    return params
+
+def output_ext(spec: TransformSpec, ext: str) -> str:
+    if spec.format:
+        return FORMAT_EXTENSIONS[spec.format]
+    ext = ext.lower()
+    return ext if Image.registered_extensions().get(ext) else ".png"
+
+def decode_image(source, spec: TransformSpec, nbytes: int | None = None, box: tuple | None = None) -> Image.Image:
+    """Decode ``source`` and apply ``spec``'s colour and geometry steps.
+
+    ``box`` is an optional ``(width, height)`` bound (either may be ``None``) that replaces
+    ``max_dimension``; it is used for download derivatives.
+
+    JPEGs go through ``draft()`` so libjpeg decodes straight to the target mode. It also
+    decodes at the smallest DCT scale that still covers the output size. Other formats
+    are checked against the limits before decoding.
+    """
+    if nbytes is not None and nbytes > Settings.IMAGE_MAX_BYTES:
+        raise ImageTooLarge(f"Image is {nbytes} bytes, over the {Settings.IMAGE_MAX_BYTES} byte limit")
 
-        output_dir = os.getenv("FILE_OUTPUT_DIR", "./output")
-        os.makedirs(output_dir, exist_ok=True)
+    img = Image.open(source)
+    width, height = img.size
+    if width * height > Settings.IMAGE_MAX_PIXELS:
+        raise ImageTooLarge(f"Image is {width}x{height}, over the {Settings.IMAGE_MAX_PIXELS} pixel limit")
 
-        name, ext = os.path.splitext(filename)
-        new_filename = f"processed_{name}{ext}"
-        new_filepath = os.path.join(output_dir, new_filename)
-        img.save(new_filepath)
+    if img.format == "JPEG":
+        img.draft("L" if spec.grayscale else "RGB", _draft_size(img.size, spec, box))
+    if spec.grayscale:
+        img = img if img.mode == "L" else img.convert("L")
+    elif img.mode not in ("L", "RGB", "RGBA"):
+        img = img.convert("RGBA" if img.has_transparency_data else "RGB")
+
+    if spec.thumbnail:
+        img = ImageOps.fit(img, (spec.thumbnail, spec.thumbnail), Image.LANCZOS)
+    else:
+        target = _fit(img.size, _target_box(img.size, spec, box))
+        if img.size != target:
+            img.thumbnail(target, Image.LANCZOS)
+    img.load()
+    return img
+
+def save_options(spec: TransformSpec, fmt: str) -> dict:
+    if fmt == "JPEG":
+        return {"quality": spec.quality, "progressive": spec.progressive, "optimize": True}
+    if fmt == "WEBP":
+        return {"quality": spec.quality, "method": 4}
+    if fmt == "PNG":
+        return {"optimize": True}
+    return {}
+
+def encode_image(img: Image.Image, ext: str, **save_kwargs) -> tuple[bytes, str]:
+    fmt = Image.registered_extensions().get(ext.lower())
+    if fmt is None:
+        fmt, ext = "PNG", ".png"
+    buffer = BytesIO()
+    img.save(buffer, format=fmt, **save_kwargs)
+    return buffer.getvalue(), ext
+
+def render(source, spec: TransformSpec, ext: str, nbytes: int | None = None,
+           box: tuple | None = None) -> tuple[bytes, str]:
+    """Decode, transform and encode ``source`` in one pass; returns ``(data, output ext)``."""
+    img = decode_image(source, spec, nbytes, box)
+    ext = output_ext(spec, ext)
+    fmt = Image.registered_extensions()[ext]
+    if fmt == "JPEG" and img.mode not in ("L", "RGB"):
+        img = img.convert("RGB")
+    return encode_image(img, ext, **save_options(spec, fmt))
+
+def convert_image(filename: str, filepath: str, cache_stats: result_cache.CacheStats,
+                  spec: TransformSpec | None = None) -> tuple[str, str]:
+    """Apply ``spec`` to the stored image ``filepath``; returns ``(output filename, output storage key)``."""
+    spec = spec or TransformSpec()
+    storage = get_storage()
+    name, ext = os.path.splitext(filename)
+    cache_key = result_cache.cache_key(result_cache.source_digest(filepath), transform_params(spec, ext))
+
+    cached = result_cache.lookup(cache_key)
+    if cached:
+        cache_stats.hit(cached)
+        new_filepath, ext = cached["output_key"], cached["ext"]
+    else:
+        cache_stats.miss()
+        cpu_started = time.thread_time()
+        with storage.open(filepath) as source:
+            data, ext = render(source, spec, ext, storage.size(filepath))
+        new_filepath = storage.put_bytes(data, ext)
+        result_cache.store(cache_key, new_filepath, ext, time.thread_time() - cpu_started)
+
+    return f"processed_{name}{ext}", new_filepath
+
+@shared_task(name="tasks.process_image", bind=True)
+def process_image(self, job_id: str, filename: str, filepath: str, transform: dict | None = None):
+    """Transform the stored image at storage key ``filepath`` (grayscale unless ``transform`` says otherwise)."""
+    job_store.mark_processing(job_id)
+
+    logger.info(f"[{job_id}] Start processing {filename}")
+    rss = RssSampler().start()
+
+    try:
+        cache_stats = result_cache.CacheStats()
+        spec = TransformSpec(**transform) if transform else None
+        new_filename, new_filepath = convert_image(filename, filepath, cache_stats, spec)
 
         result = JobStatusResponse(
             job_id=job_id,
@@ -48,10 +212,11 @@ def process_image(self, job_id: str, filename: str, filepath: str):
             file_path=new_filepath
         )
 
-        jobs.update_one(
-            {"job_id": job_id},
-            {"$set": result.model_dump(mode="json")}
-        )
+        job_store.complete(job_id, {
+            **result.model_dump(mode="json"),
+            "result_cache": cache_stats.as_dict(),
+            "peak_rss_delta_mb": rss.stop()
+        })
 
         logger.info(f"[{job_id}] Finished processing")
         return result.model_dump(mode="json")
@@ -59,13 +224,46 @@ def process_image(self, job_id: str, filename: str, filepath: str):
     except Exception as e:
         logger.exception(f"[{job_id}] Failed to process image")
 
-        jobs.update_one(
-            {"job_id": job_id},
-            {"$set": {
-                "status": "failed",
-                "progress": 100,
-                "updated_at": datetime.utcnow()
-            }}
-        )
+        job_store.fail(job_id, str(e), peak_rss_delta_mb=rss.stop())
+
+        return {"error": str(e)}
+
+@shared_task(name="tasks.process_image_chunk")
+def process_image_chunk(parent_id: str, items: list[dict], transform: dict | None = None):
+    """Convert one chunk of a batch; ``items`` are ``{index, filename, file_path}`` dicts."""
+    spec = TransformSpec(**transform) if transform else None
+    results = []
+    cache_stats = result_cache.CacheStats()
+    rss = RssSampler().start()
+    for item in items:
+        try:
+            new_filename, new_filepath = convert_image(item["filename"], item["file_path"], cache_stats, spec)
+            results.append({"index": item["index"], "filename": new_filename, "file_path": new_filepath})
+        except Exception as e:
+            logger.exception(f"[{parent_id}] Failed to process {item['filename']}")
+            results.append({"index": item["index"], "filename": item["filename"], "error": str(e)})
+        job_store.advance(parent_id, 1)
+    return {"results": results, "result_cache": cache_stats.as_dict(), "peak_rss_delta_mb": rss.stop()}
+
+@shared_task(name="tasks.finalize_image_batch")
+def finalize_image_batch(chunks: list[dict], parent_id: str):
+    results = sorted((r for chunk in chunks for r in chunk["results"]), key=lambda r: r["index"])
+    processed = [ProcessedFile(filename=r["filename"], file_path=r["file_path"]) for r in results if "error" not in r]
+    errors = [{"filename": r["filename"], "error": r["error"]} for r in results if "error" in r]
+
+    cache = {"hits": 0, "misses": 0, "cpu_seconds_saved": 0.0}
+    for chunk in chunks:
+        for field in cache:
+            cache[field] += chunk["result_cache"][field]
+    total = cache["hits"] + cache["misses"]
+    cache["hit_rate"] = round(cache["hits"] / total, 4) if total else 0.0
 
-        return {"error": str(e)}
\ No newline at end of file
+    job_store.complete(parent_id, {
+        "status": "ready" if processed else "failed",
+        "processed_files": [f.model_dump() for f in processed],
+        "errors": errors,
+        "result_cache": cache,
+        "peak_rss_delta_mb": max((chunk.get("peak_rss_delta_mb") or 0.0 for chunk in chunks), default=0.0)
+    })
+    logger.info(f"[{parent_id}] Batch finished: {len(processed)} converted, {len(errors)} failed")
+    return {"job_id": parent_id, "processed": len(processed), "failed": len(errors)}
@@ -0,0 +1,114 @@
+import os
+import time
+import logging
+import redis
+from celery import shared_task
+from app.settings import Settings
+from app.repositories import job_store, upload_store
+from app.storage import get_storage
+from app.tasks.http_cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+def _collect_orphans(storage, batch: list) -> list:
+    aliases = {obj.key: storage.aliases(obj.key) for obj in batch}
+    referenced = job_store.referenced_paths([alias for names in aliases.values() for alias in names])
+    return [obj for obj in batch if not referenced.intersection(aliases[obj.key])]
+
+def _load_cursor() -> str | None:
+    try:
+        cursor = get_redis().get(Settings.GC_CURSOR_KEY)
+    except redis.RedisError as e:
+        logger.warning(f"GC could not read its resume point, starting over: {e}")
+        return None
+    return cursor.decode() if cursor else None
+
+def _save_cursor(cursor: str | None):
+    try:
+        client = get_redis()
+        if cursor:
+            client.set(Settings.GC_CURSOR_KEY, cursor)
+        else:
+            client.delete(Settings.GC_CURSOR_KEY)
+    except redis.RedisError as e:
+        logger.warning(f"GC could not save its resume point: {e}")
+
+@shared_task(name="tasks.gc_output_files", ignore_result=False)
+def gc_output_files():
+    """Sweep up to ``GC_MAX_FILES_PER_RUN`` objects, resuming after the last key the previous run scanned.
+
+    Without the resume point every run would rescan the same leading objects and never
+    reach orphans beyond the cap.
+    """
+    storage = get_storage()
+    cutoff = time.time() - Settings.GC_GRACE_SECONDS
+    start_after = _load_cursor()
+    report = {"scanned": 0, "deleted": 0, "bytes_reclaimed": 0, "errors": 0, "resumed_from": start_after}
+    started = time.perf_counter()
+
+    def sweep(batch):
+        for obj in _collect_orphans(storage, batch):
+            try:
+                # Re-check: a dedup or cache hit since the listing refreshed the mtime, and the
+                # job that will reference the object may not be written yet.
+                mtime = storage.mtime(obj.key)
+                if mtime is None or mtime > cutoff:
+                    continue
+                storage.delete(obj.key)
+                report["deleted"] += 1
+                report["bytes_reclaimed"] += obj.size
+            except OSError as e:
+                report["errors"] += 1
+                logger.warning(f"GC could not remove {obj.key}: {e}")
+        time.sleep(Settings.GC_BATCH_PAUSE)
+
+    batch = []
+    last_key, finished = None, True
+    for obj in storage.iter_objects(start_after):
+        if report["scanned"] >= Settings.GC_MAX_FILES_PER_RUN:
+            finished = False
+            break
+        report["scanned"] += 1
+        last_key = obj.key
+        if obj.mtime > cutoff:
+            continue
+        batch.append(obj)
+        if len(batch) >= Settings.GC_BATCH_SIZE:
+            sweep(batch)
+            batch = []
+    if batch:
+        sweep(batch)
+    # A finished pass starts the next run from the beginning again.
+    _save_cursor(None if finished else last_key)
+    report["pass_complete"] = finished
+
+    report["seconds"] = round(time.perf_counter() - started, 2)
+    logger.info(f"Output GC finished: {report}")
+    return report
+
+@shared_task(name="tasks.gc_upload_sessions", ignore_result=False)
+def gc_upload_sessions():
+    """Remove part files whose upload session expired (the TTL index drops the session document)."""
+    cutoff = time.time() - Settings.UPLOAD_SESSION_TTL
+    report = {"scanned": 0, "deleted": 0, "bytes_reclaimed": 0}
+    try:
+        entries = [e for e in os.scandir(Settings.UPLOAD_DIR) if e.name.endswith(".part")]
+    except FileNotFoundError:
+        return report
+
+    stale = {e.name[:-len(".part")]: e for e in entries if e.stat().st_mtime < cutoff}
+    report["scanned"] = len(entries)
+    live = {s["_id"] for s in upload_store.get_sessions().find({"_id": {"$in": list(stale)}}, {"_id": 1})}
+    for upload_id, entry in stale.items():
+        if upload_id in live:
+            continue
+        try:
+            size = entry.stat().st_size
+            os.remove(entry.path)
+            report["deleted"] += 1
+            report["bytes_reclaimed"] += size
+        except OSError as e:
+            logger.warning(f"Upload GC could not remove {entry.path}: {e}")
+
+    logger.info(f"Upload GC finished: {report}")
+    return report
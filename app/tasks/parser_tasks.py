@@ -1,58 +1,122 @@
 from celery import shared_task
-import os, uuid, logging, requests
+import os, time, uuid, logging
 from datetime import datetime
-from pymongo import MongoClient
-from bs4 import BeautifulSoup
-from PIL import Image
 from io import BytesIO
-from urllib.parse import urljoin
-from app.schemas import ParsedImage, ParseResult
-from app.rag.vector_store import add_metadata
+from urllib.parse import urlparse
+from pymongo.errors import DuplicateKeyError
+from app.schemas import ParsedImage, ParseResult, TransformSpec
+from app.rag.vector_store import add_metadata, get_vectorstore
+from app.repositories import job_store, result_cache
+from app.tasks import http_cache
+from app.tasks.fetcher import fetch, fetch_all, fetch_page
+from app.tasks.html_images import extract_images
+from app.tasks.image_tasks import render, transform_params
+from app.storage import get_storage
+from app.settings import Settings
 
 logger = logging.getLogger(__name__)
 
+def _outputs_available(outputs: dict | None) -> bool:
+    storage = get_storage()
+    return bool(outputs) and all(storage.exists(f["file_path"]) for f in outputs["processed_files"])
+
 @shared_task(name="tasks.parse_page")
-def parse_page(job_id: str, url: str, limit: int = 5):
-    client = MongoClient(os.getenv("MONGO_URI"))
-    db = client.get_default_database()
-    jobs = db["jobs"]
+def parse_page(job_id: str, url: str, limit: int = 5, transform: dict | None = None):
+    spec = TransformSpec(**transform) if transform else TransformSpec(format="webp")
+    spec_params = spec.model_dump()
+    job_store.mark_processing(job_id)
+    http_stats = {"not_modified": 0, "bytes_saved": 0, "bytes_downloaded": 0}
 
-    jobs.update_one({"job_id": job_id}, {
-        "$set": {"status": "processing", "progress": 25, "updated_at": datetime.utcnow()}
-    })
+    def extract(chunks, encoding):
+        return extract_images(chunks, url, limit, encoding)
 
+    fetch_started = time.perf_counter()
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
+        page, images = fetch_page(url, extract)
+        outputs = http_cache.get_page_outputs(url, limit, spec_params) if page.not_modified else None
+        if page.not_modified and not _outputs_available(outputs):
+            (page, images), outputs = fetch_page(url, extract, conditional=False), None
     except Exception as e:
-        jobs.update_one({"job_id": job_id}, {"$set": {"status": "failed", "progress": 100}})
+        job_store.fail(job_id, str(e))
         return {"error": str(e)}
 
-    soup = BeautifulSoup(response.text, "html.parser")
-    images = [urljoin(url, img["src"]) for img in soup.find_all("img") if "src" in img.attrs][:limit]
+    if outputs:
+        # Page unchanged since the last run: reuse its outputs without touching the images.
+        http_stats.update(not_modified=1 + len(outputs["processed_files"]), bytes_saved=page.size + outputs["bytes"])
+        result = ParseResult(
+            job_id=job_id,
+            status="ready",
+            progress=100,
+            updated_at=datetime.utcnow(),
+            parsed_data=outputs["parsed_data"],
+            processed_files=outputs["processed_files"]
+        )
+        job_store.complete(job_id, {
+            **result.model_dump(mode="json"),
+            "fetch_seconds": round(page.finished_at - fetch_started, 3),
+            "processing_seconds": round(time.perf_counter() - fetch_started, 3),
+            "http_cache": http_stats
+        })
+        logger.info(f"[{job_id}] {url} not modified, reused previous outputs")
+        return result.model_dump(mode="json")
+
+    http_stats["bytes_downloaded"] += page.size
 
-    processed_files = []
-    output_dir = os.getenv("FILE_OUTPUT_DIR", "./output")
-    os.makedirs(output_dir, exist_ok=True)
+    storage = get_storage()
 
-    for full_url in images:
+    converted = {}
+    source_bytes = 0
+    fetches_finished = page.finished_at
+    cache_stats = result_cache.CacheStats()
+
+    for index, full_url, fetched, error in fetch_all(images):
+        if error is not None:
+            logger.error(f"[{job_id}] Failed to process {full_url}: {error}")
+            continue
+        fetches_finished = max(fetches_finished, fetched.finished_at)
         try:
-            if not full_url.lower().endswith((".png", ".jpg", ".jpeg", ".gif", ".webp")):
-                continue
-            img_resp = requests.get(full_url, timeout=5)
-            img_resp.raise_for_status()
-            img = Image.open(BytesIO(img_resp.content)).convert("L")
+            source_ext = os.path.splitext(urlparse(full_url).path)[1]
+            cache_key = result_cache.cache_key(fetched.digest, transform_params(spec, source_ext))
+            cached = result_cache.lookup(cache_key)
+            if cached:
+                cache_stats.hit(cached)
+                filepath, ext = cached["output_key"], cached["ext"]
+            else:
+                cache_stats.miss()
+                content = fetched.content
+                if content is None:
+                    # 304, but the output it pointed at is gone: download the body after all.
+                    fetched = fetch(full_url, conditional=False)
+                    content = fetched.content
+                cpu_started = time.thread_time()
+                data, ext = render(BytesIO(content), spec, source_ext, len(content))
+                filepath = storage.put_bytes(data, ext)
+                result_cache.store(cache_key, filepath, ext, time.thread_time() - cpu_started)
+
+            if fetched.not_modified:
+                http_stats["not_modified"] += 1
+                http_stats["bytes_saved"] += fetched.size
+            else:
+                http_stats["bytes_downloaded"] += fetched.size
+            source_bytes += fetched.size
 
-            filename = f"parsed_{uuid.uuid4().hex}.png"
-            filepath = os.path.join(output_dir, filename)
-            img.save(filepath)
+            filename = f"parsed_{uuid.uuid4().hex}{ext}"
 
-            processed_files.append(ParsedImage(filename=filename, file_path=filepath, source_url=full_url))
-            add_metadata(f"Parsed image {filename} from {full_url} at {datetime.utcnow()}")
+            converted[index] = ParsedImage(filename=filename, file_path=filepath, source_url=full_url)
+            add_metadata(
+                get_vectorstore(),
+                f"Parsed image {filename} from {full_url} at {datetime.utcnow()}",
+                {"job_id": job_id, "source_url": full_url, "filename": filename}
+            )
 
         except Exception as e:
             logger.error(f"[{job_id}] Failed to process {full_url}: {e}")
             continue
+    # Downloads overlap with conversion, so fetch time ends when the last download landed.
+    fetch_seconds = fetches_finished - fetch_started
+    processing_seconds = time.perf_counter() - fetch_started
+
+    processed_files = [converted[index] for index in sorted(converted)]
 
     status = "ready" if processed_files else "failed"
     result = ParseResult(
@@ -63,6 +127,31 @@ def parse_page(job_id: str, url: str, limit: int = 5):
         parsed_data=images,
         processed_files=processed_files
     )
+    dumped = result.model_dump(mode="json")
+
+    if status == "ready" and len(processed_files) == len(images):
+        http_cache.store_page_outputs(url, limit, spec_params, {
+            "parsed_data": dumped["parsed_data"],
+            "processed_files": dumped["processed_files"],
+            "bytes": source_bytes
+        })
 
-    jobs.update_one({"job_id": job_id}, {"$set": result.model_dump(mode="json")})
-    return result.model_dump(mode="json")
\ No newline at end of file
+    job_store.complete(job_id, {
+        **dumped,
+        "fetch_seconds": round(fetch_seconds, 3),
+        "processing_seconds": round(processing_seconds, 3),
+        "result_cache": cache_stats.as_dict(),
+        "http_cache": http_stats
+    })
+    return dumped
+
+@shared_task(name="tasks.parse_page_daily")
+def parse_page_daily(url: str, limit: int = 5):
+    """Beat entry point: one job document per day, so GC and page-output reuse see its outputs as referenced."""
+    job_id = f"{Settings.DAILY_JOB_ID}-{datetime.utcnow():%Y-%m-%d}"
+    try:
+        job_store.create_job(job_id, "parse", {"url": url, "limit": limit})
+    except DuplicateKeyError:
+        # Re-run on the same day (retry or manual trigger): refresh the existing job.
+        pass
+    return parse_page(job_id, url, limit)
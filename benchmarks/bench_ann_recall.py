@@ -0,0 +1,46 @@
+"""Recall@k vs per-query latency of the ANN tiers on a synthetic corpus.
+
+Usage: python -m benchmarks.bench_ann_recall [vectors] [dimension] [queries]
+"""
+import sys
+import time
+import faiss
+import numpy as np
+from app.rag.index_tiering import build_ann_index
+
+K = 10
+
+def recall(found: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.mean([len(set(f) & set(t)) / K for f, t in zip(found, truth)]))
+
+def timed_search(index, queries, params=None):
+    start = time.perf_counter()
+    _, labels = index.search(queries, K, params=params)
+    return labels, (time.perf_counter() - start) / len(queries) * 1000
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    dimension = int(sys.argv[2]) if len(sys.argv) > 2 else 768
+    nq = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    rng = np.random.default_rng(42)
+    centers = rng.standard_normal((256, dimension)).astype(np.float32)
+    vectors = (centers[rng.integers(0, 256, n)] + 0.3 * rng.standard_normal((n, dimension))).astype(np.float32)
+    queries = (centers[rng.integers(0, 256, nq)] + 0.3 * rng.standard_normal((nq, dimension))).astype(np.float32)
+
+    flat = faiss.IndexFlatL2(dimension)
+    flat.add(vectors)
+    truth, flat_ms = timed_search(flat, queries)
+    print(f"{'flat':>6} {'':>14} recall@{K}=1.000 {flat_ms:8.3f} ms/query")
+
+    for tier, param, values in (("ivf", "nprobe", (1, 4, 16, 64)), ("hnsw", "efSearch", (16, 32, 64, 128))):
+        start = time.perf_counter()
+        index = build_ann_index(vectors, tier)
+        print(f"{tier:>6} built in {time.perf_counter() - start:.1f}s")
+        for value in values:
+            if tier == "ivf":
+                params = faiss.SearchParametersIVF(nprobe=value)
+            else:
+                params = faiss.SearchParametersHNSW(efSearch=value)
+            labels, ms = timed_search(index, queries, params)
+            print(f"{tier:>6} {param}={value:<5} recall@{K}={recall(labels, truth):.3f} {ms:8.3f} ms/query")
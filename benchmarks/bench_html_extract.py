@@ -0,0 +1,57 @@
+"""Streaming ``extract_images`` vs the previous BeautifulSoup path on large synthetic pages.
+
+The page front-loads SVG, data-URI and lazy-loaded images, the case where
+``soup.find_all("img")[:limit]`` followed by an extension filter used to yield nothing.
+
+Usage: python -m benchmarks.bench_html_extract [page_mb] [limit]
+"""
+import sys
+import time
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+from app.tasks.html_images import extract_images
+
+BASE_URL = "https://example.com/gallery/"
+CHUNK = 16 * 1024
+
+def make_page(size_mb: float) -> bytes:
+    head = "".join(
+        f'<div class="card"><img src="icon{i}.svg"><img src="data:image/gif;base64,R0lGOD{i}">'
+        f'<p>{"lorem ipsum " * 20}</p></div>'
+        for i in range(2000)
+    )
+    lazy = "".join(f'<img src="blank.gif#{i}" data-src="photos/{i}.jpg" loading="lazy">' for i in range(200))
+    filler = f'<section><p>{"dolor sit amet " * 40}</p></section>'
+    repeats = max(0, int((size_mb * 1024 * 1024 - len(head) - len(lazy)) / len(filler)) + 1)
+    return f"<html><body>{head}{lazy}{filler * repeats}</body></html>".encode()
+
+def soup_path(page: bytes, limit: int) -> list[str]:
+    soup = BeautifulSoup(page.decode(), "html.parser")
+    images = [urljoin(BASE_URL, img["src"]) for img in soup.find_all("img") if "src" in img.attrs][:limit]
+    return [u for u in images if u.lower().endswith((".png", ".jpg", ".jpeg", ".gif", ".webp"))]
+
+def streaming_path(page: bytes, limit: int) -> tuple[list[str], int]:
+    read = 0
+    def chunks():
+        nonlocal read
+        for i in range(0, len(page), CHUNK):
+            read += min(CHUNK, len(page) - i)
+            yield page[i:i + CHUNK]
+    return extract_images(chunks(), BASE_URL, limit), read
+
+if __name__ == "__main__":
+    size_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    page = make_page(size_mb)
+
+    start = time.perf_counter()
+    found = soup_path(page, limit)
+    soup_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    streamed, read = streaming_path(page, limit)
+    stream_seconds = time.perf_counter() - start
+
+    print(f"page: {len(page) / 1024 / 1024:.1f} MB, limit {limit}")
+    print(f"BeautifulSoup: {soup_seconds:.3f}s, {len(found)} usable images, read {len(page)} bytes")
+    print(f"streaming:     {stream_seconds:.3f}s, {len(streamed)} usable images, read {read} bytes")
@@ -0,0 +1,39 @@
+"""Ingest throughput (texts/sec) into the vector service with and without the micro-batching buffer.
+
+Producers submit without waiting and the results are collected at the end, so the
+buffer fills by size the way concurrent ``parse_page`` tasks fill it.
+
+Usage: docker compose exec web python -m benchmarks.bench_ingest [texts] [threads]
+"""
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from app.rag.vector_store import get_vectorstore, IngestBuffer
+from app.settings import Settings
+
+def run(name, submit, texts, threads, wait=lambda result: result):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(submit, texts))
+    for result in results:
+        wait(result)
+    elapsed = time.perf_counter() - start
+    print(f"{name:>12}: {len(texts) / elapsed:8.1f} texts/sec ({elapsed:.2f}s)")
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    vectorstore = get_vectorstore()
+    run_id = uuid.uuid4().hex
+
+    unbatched = [f"bench {run_id} unbatched text {i}" for i in range(n)]
+    run("unbatched", lambda text: vectorstore.add_texts([text], [{}]), unbatched, threads)
+
+    buffer = IngestBuffer(
+        vectorstore,
+        max_size=Settings.VECTOR_INGEST_BATCH_SIZE,
+        max_age=Settings.VECTOR_INGEST_MAX_AGE_MS / 1000
+    )
+    batched = [f"bench {run_id} batched text {i}" for i in range(n)]
+    run("batched", lambda text: buffer.submit([text]), batched, threads, wait=lambda future: future.result())
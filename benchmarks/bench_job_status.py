@@ -0,0 +1,35 @@
+"""N single GET /api/jobs/<id> lookups vs one POST /api/jobs/status:batch.
+
+Usage: BASE_URL=http://localhost:8000 MONGO_URI=... python -m benchmarks.bench_job_status [jobs]
+"""
+import os
+import sys
+import time
+import uuid
+import requests
+from app.repositories import job_store
+
+BASE_URL = os.getenv("BASE_URL", "http://localhost:8000")
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    job_ids = [f"bench-{uuid.uuid4().hex}" for _ in range(n)]
+    for job_id in job_ids:
+        job_store.create_job(job_id, "bench")
+
+    session = requests.Session()
+    try:
+        start = time.perf_counter()
+        for job_id in job_ids:
+            session.get(f"{BASE_URL}/api/jobs/{job_id}").raise_for_status()
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        response = session.post(f"{BASE_URL}/api/jobs/status:batch", json={"job_ids": job_ids})
+        response.raise_for_status()
+        batch = time.perf_counter() - start
+
+        print(f"{n} single lookups: {single:.3f}s ({single / n * 1000:.2f} ms/job)")
+        print(f"1 batch lookup:    {batch:.3f}s ({len(response.json()['jobs'])} jobs, {single / batch:.0f}x faster)")
+    finally:
+        job_store.get_jobs().delete_many({"job_id": {"$in": job_ids}})
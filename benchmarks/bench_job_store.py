@@ -0,0 +1,38 @@
+"""Jobs/sec for the Mongo job lifecycle: a new MongoClient per job vs the pooled job store.
+
+Usage: MONGO_URI=mongodb://localhost:27017/flask_jobs python -m benchmarks.bench_job_store [jobs]
+"""
+import sys
+import time
+import uuid
+from datetime import datetime
+from pymongo import MongoClient
+from app.settings import Settings
+from app.repositories import job_store
+
+def per_job_client(job_id: str):
+    client = MongoClient(Settings.MONGO_URI)
+    jobs = client.get_default_database(default=Settings.MONGO_DB_NAME)[Settings.MONGO_COLLECTION_NAME]
+    jobs.insert_one({"job_id": job_id, "status": "queued", "progress": 0, "created_at": datetime.utcnow()})
+    jobs.update_one({"job_id": job_id}, {"$set": {"status": "processing", "progress": 25}})
+    jobs.update_one({"job_id": job_id}, {"$set": {"status": "ready", "progress": 100}})
+    client.close()
+
+def pooled(job_id: str):
+    job_store.create_job(job_id, "bench")
+    job_store.mark_processing(job_id)
+    job_store.complete(job_id, {"status": "ready"})
+
+def run(name, fn, n: int):
+    ids = [f"bench-{uuid.uuid4().hex}" for _ in range(n)]
+    start = time.perf_counter()
+    for job_id in ids:
+        fn(job_id)
+    elapsed = time.perf_counter() - start
+    print(f"{name:>16}: {n / elapsed:8.1f} jobs/sec ({elapsed:.2f}s for {n} jobs)")
+    job_store.get_jobs().delete_many({"job_id": {"$in": ids}})
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    run("client per job", per_job_client, n)
+    run("pooled store", pooled, n)
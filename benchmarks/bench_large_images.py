@@ -0,0 +1,54 @@
+"""Peak RSS of a naive ``Image.open().convert("L")`` vs ``decode_image`` on 50-200 MP JPEGs.
+
+Each decode runs in a fresh interpreter so ``ru_maxrss`` reflects that decode alone.
+
+Usage: python -m benchmarks.bench_large_images [megapixels ...]
+"""
+import os
+import sys
+import time
+import resource
+import tempfile
+import subprocess
+from PIL import Image, ImageDraw
+
+def make_jpeg(path: str, megapixels: int):
+    side = int((megapixels * 1_000_000) ** 0.5)
+    Image.MAX_IMAGE_PIXELS = None
+    img = Image.linear_gradient("L").resize((side, side)).convert("RGB")
+    draw = ImageDraw.Draw(img)
+    for x in range(0, side, 512):
+        draw.line((x, 0, side - x, side), fill=(200, 40, 90), width=9)
+    img.save(path, quality=90)
+
+def decode(mode: str, path: str):
+    if mode == "naive":
+        Image.MAX_IMAGE_PIXELS = None
+        started = time.perf_counter()
+        img = Image.open(path).convert("L")
+    else:
+        from app.schemas import TransformSpec
+        from app.tasks.image_tasks import decode_image
+        started = time.perf_counter()
+        img = decode_image(path, TransformSpec(), os.path.getsize(path))
+    elapsed = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{img.size[0]}x{img.size[1]} {elapsed:.2f} {peak:.0f}")
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--decode"]:
+        decode(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+
+    sizes = [int(a) for a in sys.argv[1:]] or [50, 100, 200]
+    env = {**os.environ, "IMAGE_MAX_PIXELS": str(max(sizes) * 2_000_000)}
+    with tempfile.TemporaryDirectory() as tmp:
+        for megapixels in sizes:
+            path = os.path.join(tmp, f"{megapixels}mp.jpg")
+            make_jpeg(path, megapixels)
+            for mode in ("naive", "draft"):
+                out = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_large_images", "--decode", mode, path],
+                    env=env, capture_output=True, text=True, check=True
+                ).stdout.split()
+                print(f"{megapixels:>4} MP {mode:<6} {out[0]:>12}  {float(out[1]):6.2f}s  peak RSS {out[2]:>6} MB")
@@ -0,0 +1,27 @@
+"""Cold-start time of create_app() in a fresh interpreter, checked against a budget.
+
+Exits non-zero when the median exceeds the budget, so it can gate CI.
+Usage: python -m benchmarks.bench_startup [runs] [budget_seconds]
+"""
+import sys
+import statistics
+import subprocess
+
+SNIPPET = (
+    "import time; started = time.perf_counter(); "
+    "from app.factory import create_app; create_app(); "
+    "print(time.perf_counter() - started)"
+)
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    budget = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", SNIPPET], capture_output=True, text=True, check=True)
+        timings.append(float(output.stdout.strip().splitlines()[-1]))
+
+    median = statistics.median(timings)
+    print(f"create_app cold start: median {median:.3f}s, min {min(timings):.3f}s, max {max(timings):.3f}s (budget {budget:.1f}s)")
+    sys.exit(0 if median <= budget else 1)
@@ -0,0 +1,57 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app.storage.derivatives import DerivativeCache
+
+def make_cache(tmp_path, max_bytes=10_000):
+    return DerivativeCache(str(tmp_path), max_bytes, evict_interval=0, evict_grace=0)
+
+def test_miss_renders_then_hit_reuses(tmp_path):
+    cache = make_cache(tmp_path)
+    key = cache.key("a" * 64, {"w": 100})
+    renders = []
+    def render():
+        renders.append(1)
+        return b"derived"
+
+    path, hit = cache.get_or_create(key, ".webp", render)
+    assert not hit and open(path, "rb").read() == b"derived"
+    assert cache.get_or_create(key, ".webp", render) == (path, True)
+    assert len(renders) == 1
+
+    # The shard lock outlives the render so later waiters share the same inode.
+    assert os.path.exists(os.path.join(os.path.dirname(path), ".lock"))
+
+def test_params_change_the_key(tmp_path):
+    cache = make_cache(tmp_path)
+    assert cache.key("a" * 64, {"w": 100}) != cache.key("a" * 64, {"w": 200})
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = make_cache(tmp_path, max_bytes=2500)
+    paths = {}
+    for i, name in enumerate(["old", "used", "new"]):
+        key = cache.key(name, {})
+        paths[name], _ = cache.get_or_create(key, ".png", lambda: b"x" * 1000)
+        stamp = time.time() - 3600 + i * 60
+        os.utime(paths[name], (stamp, stamp))
+
+    # A hit bumps "used" ahead of "new", so "old" is the one to go.
+    cache.get_or_create(cache.key("used", {}), ".png", lambda: b"")
+    cache.get_or_create(cache.key("trigger", {}), ".png", lambda: b"x" * 100)
+
+    assert not os.path.exists(paths["old"])
+    assert os.path.exists(paths["used"]) and os.path.exists(paths["new"])
+
+def test_concurrent_misses_render_once(tmp_path):
+    cache = make_cache(tmp_path)
+    key = cache.key("b" * 64, {})
+    renders = []
+    def render():
+        renders.append(1)
+        time.sleep(0.05)
+        return b"derived"
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: cache.get_or_create(key, ".png", render), range(8)))
+    assert len(renders) == 1
+    assert sum(not hit for _, hit in results) == 1
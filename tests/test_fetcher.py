@@ -0,0 +1,17 @@
+from app.tasks.fetcher import HostLimiter
+
+def test_idle_hosts_are_pruned_oldest_first():
+    limiter = HostLimiter(per_host=2, max_hosts=3)
+    for i in range(10):
+        with limiter.limit(f"https://host{i}.example/a.png"):
+            pass
+    assert len(limiter) == 3
+    assert list(limiter._hosts) == ["host7.example", "host8.example", "host9.example"]
+
+def test_busy_hosts_are_kept():
+    limiter = HostLimiter(per_host=1, max_hosts=1)
+    with limiter.limit("https://busy.example/a.png"):
+        with limiter.limit("https://other.example/b.png"):
+            assert "busy.example" in limiter._hosts
+        semaphore = limiter._hosts["busy.example"][0]
+        assert not semaphore.acquire(blocking=False)
@@ -0,0 +1,70 @@
+import pytest
+from app.tasks.html_images import best_srcset, extract_images, sniff_encoding
+
+BASE = "https://example.com/gallery/"
+
+def chunked(html: str | bytes, size: int = 64, consumed: list | None = None):
+    data = html.encode() if isinstance(html, str) else html
+    for i in range(0, len(data), size):
+        if consumed is not None:
+            consumed.append(i + size)
+        yield data[i:i + size]
+
+@pytest.mark.parametrize("value, expected", [
+    ("a.jpg 1x, b.jpg 2x", "b.jpg"),
+    ("small.jpg 480w, large.jpg 1600w, mid.jpg 800w", "large.jpg"),
+    ("only.jpg", "only.jpg"),
+    (
+        "https://cdn.example/img/w_800,h_600/photo.jpg 800w, https://cdn.example/img/w_1600,h_1200/photo.jpg 1600w",
+        "https://cdn.example/img/w_1600,h_1200/photo.jpg"
+    ),
+    ("a.jpg,, b.jpg 2x", "b.jpg"),
+    ("", None),
+])
+def test_best_srcset(value, expected):
+    assert best_srcset(value) == expected
+
+def test_picture_uses_first_valid_source_then_img_fallback():
+    html = (
+        '<picture><source srcset="vector.svg"><img src="fallback.png"></picture>'
+        '<picture><source srcset="hero.webp 2x, hero-small.webp 1x"><img src="hero.jpg"></picture>'
+    )
+    assert extract_images(chunked(html), BASE, None) == [
+        "https://example.com/gallery/fallback.png",
+        "https://example.com/gallery/hero.webp"
+    ]
+
+def test_lazy_data_src_beats_placeholder_src():
+    html = '<img src="data:image/gif;base64,R0lGOD" data-src="photos/1.jpg"><img src="blank.gif#x" data-src="/p/2.png">'
+    assert extract_images(chunked(html), BASE, None) == [
+        "https://example.com/gallery/photos/1.jpg",
+        "https://example.com/p/2.png"
+    ]
+
+def test_skips_non_raster_and_duplicates():
+    html = '<img src="icon.svg"><img src="a.jpg"><img src="a.jpg"><img src="b.JPG?v=2">'
+    assert extract_images(chunked(html), BASE, None) == [
+        "https://example.com/gallery/a.jpg",
+        "https://example.com/gallery/b.JPG?v=2"
+    ]
+
+def test_stops_reading_once_limit_is_reached():
+    html = '<img src="1.jpg"><img src="2.jpg">' + "<p>filler</p>" * 10_000 + '<img src="3.jpg">'
+    consumed = []
+    images = extract_images(chunked(html, consumed=consumed), BASE, 2)
+    assert images == ["https://example.com/gallery/1.jpg", "https://example.com/gallery/2.jpg"]
+    assert consumed[-1] < len(html) // 10
+
+def test_sniffs_meta_charset_when_undeclared():
+    html = '<html><head><meta charset="windows-1251"></head><body><img src="фото.jpg"></body></html>'
+    images = extract_images(chunked(html.encode("windows-1251"), size=8), BASE, None)
+    assert images == ["https://example.com/gallery/фото.jpg"]
+
+def test_defaults_to_utf8_when_undeclared():
+    html = '<img src="café.jpg">'
+    assert extract_images(chunked(html.encode()), BASE, None) == ["https://example.com/gallery/café.jpg"]
+
+def test_sniff_encoding():
+    assert sniff_encoding(b'<meta http-equiv="Content-Type" content="text/html; charset=Shift_JIS">') == "Shift_JIS"
+    assert sniff_encoding(b"\xef\xbb\xbf<html>") == "utf-8-sig"
+    assert sniff_encoding(b"<html>") is None
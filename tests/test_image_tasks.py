@@ -0,0 +1,25 @@
+from io import BytesIO
+from PIL import Image
+from app.schemas import TransformSpec
+from app.tasks.image_tasks import RssSampler, render
+
+def test_rss_sampler_reports_growth_during_the_task_only():
+    ballast = bytearray(64 * 1024 * 1024)  # raises the process high-water mark before the task
+    del ballast
+
+    rss = RssSampler(interval=0.01).start()
+    block = bytearray(b"\x01" * (32 * 1024 * 1024))
+    delta = rss.stop()
+    del block
+
+    assert delta is not None
+    assert 24 <= delta < 64
+
+def test_render_accepts_uppercase_source_extensions():
+    source = BytesIO()
+    Image.new("RGB", (40, 30), "red").save(source, format="JPEG")
+    source.seek(0)
+
+    data, ext = render(source, TransformSpec(), ".JPG")
+    assert ext == ".jpg"
+    assert Image.open(BytesIO(data)).format == "JPEG"
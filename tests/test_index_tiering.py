@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.embeddings import FakeEmbeddings
+from app.rag import index_tiering
+
+DIMENSION = 16
+
+def make_store(tier: str, n: int = 300):
+    vectors = np.random.default_rng(1).random((n, DIMENSION), dtype=np.float32)
+    ids = [f"doc-{i}" for i in range(n)]
+    store = FAISS(
+        embedding_function=FakeEmbeddings(size=DIMENSION),
+        index=index_tiering.build_ann_index(vectors, tier),
+        docstore=InMemoryDocstore({}),
+        index_to_docstore_id={}
+    )
+    store.docstore.add({doc_id: Document(page_content=doc_id) for doc_id in ids})
+    store.index_to_docstore_id.update(dict(enumerate(ids)))
+    return store, vectors
+
+@pytest.mark.parametrize("tier", ["ivf", "hnsw"])
+def test_delete_then_add_keeps_labels_consistent(tier):
+    store, vectors = make_store(tier)
+    assert index_tiering.index_kind(store.index) == tier
+
+    assert index_tiering.delete(store, ["doc-0", "doc-1"])
+    new_vector = np.full(DIMENSION, 5.0, dtype=np.float32)
+    index_tiering.add(store, ["fresh"], [new_vector.tolist()], [{}], ["doc-new"])
+
+    # The surviving last row must still resolve to its own document.
+    last = index_tiering.search(store, vectors[-1].tolist(), k=1, nprobe=1024, ef_search=256)
+    assert last[0][0].page_content == "doc-299"
+
+    fresh = index_tiering.search(store, new_vector.tolist(), k=1, nprobe=1024, ef_search=256)
+    assert fresh[0][0].page_content == "fresh"
+
+    deleted = index_tiering.search(store, vectors[0].tolist(), k=5, nprobe=1024, ef_search=256)
+    assert "doc-0" not in [doc.page_content for doc, _ in deleted]
@@ -0,0 +1,85 @@
+import json
+from datetime import datetime, timedelta
+import queue
+import threading
+from app import job_events
+from app.job_events import JobEventHub
+
+class StubPubSub:
+    """Confirms the pattern subscription only when the test allows it, then relays ``published``."""
+
+    def __init__(self, confirm: threading.Event, published: queue.Queue):
+        self.confirm = confirm
+        self.published = published
+
+    def psubscribe(self, pattern):
+        self.pattern = pattern
+
+    def listen(self):
+        self.confirm.wait()
+        yield {"type": "psubscribe", "pattern": None, "channel": self.pattern, "data": 1}
+        while True:
+            yield {"type": "pmessage", "pattern": self.pattern, "channel": b"", "data": self.published.get()}
+
+class StubRedis:
+    def __init__(self, pubsub):
+        self._pubsub = pubsub
+
+    def pubsub(self, **kwargs):
+        return self._pubsub
+
+def test_subscribe_returns_only_once_the_subscription_is_live(monkeypatch):
+    confirm, published = threading.Event(), queue.Queue()
+    monkeypatch.setattr(job_events.redis.Redis, "from_url", lambda url: StubRedis(StubPubSub(confirm, published)))
+    hub = JobEventHub("redis://stub")
+
+    returned = threading.Event()
+    result = {}
+    def subscribe():
+        result["subscriber"] = hub.subscribe(["job-1"])
+        returned.set()
+    threading.Thread(target=subscribe, daemon=True).start()
+
+    assert not returned.wait(0.2)
+    confirm.set()
+    assert returned.wait(2)
+
+    published.put(json.dumps({"job_id": "job-1", "status": "ready"}))
+    assert result["subscriber"].get(timeout=2) == {"job_id": "job-1", "status": "ready"}
+
+class StubJobs:
+    def __init__(self, jobs):
+        self.jobs = jobs
+
+    def find(self, query, projection=None):
+        return [dict(job) for job in self.jobs]
+
+class QueuedHub:
+    """Hub whose subscriber already holds the events published between subscribe and the snapshot."""
+
+    def __init__(self, events):
+        self.events = events
+
+    def subscribe(self, job_ids):
+        subscriber = queue.Queue()
+        for event in self.events:
+            subscriber.put(event)
+        return subscriber
+
+    def unsubscribe(self, subscriber, job_ids):
+        pass
+
+def test_events_older_than_the_snapshot_are_dropped(monkeypatch):
+    snapshot_at = datetime(2026, 1, 1, 12, 0, 0, 500000)
+    queued = [
+        {"job_id": "job-1", "status": "processing", "progress": 25, "updated_at": str(snapshot_at - timedelta(seconds=2))},
+        {"job_id": "job-1", "status": "processing", "progress": 60, "updated_at": str(snapshot_at + timedelta(microseconds=400))},
+        {"job_id": "job-1", "status": "processing", "progress": 80, "updated_at": str(snapshot_at + timedelta(microseconds=700))},
+        {"job_id": "job-1", "status": "ready", "progress": 100, "updated_at": str(snapshot_at + timedelta(seconds=1))},
+    ]
+    monkeypatch.setattr(job_events, "get_hub", lambda: QueuedHub(queued))
+    jobs = StubJobs([{"job_id": "job-1", "status": "processing", "progress": 60, "updated_at": snapshot_at}])
+
+    progress = [data["progress"] for name, data in job_events.stream_job_events(jobs, ["job-1"]) if name == "status"]
+    # The snapshot (60), the same-millisecond update it lacks (80), then the terminal event.
+    assert progress == [60, 80, 100]
@@ -0,0 +1,96 @@
+import os
+import time
+from app.settings import Settings
+from app.storage.local import LocalStorage
+from app.tasks import maintenance_tasks
+
+class StubRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value):
+        self.values[key] = value.encode()
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+class StubJobs:
+    def __init__(self, docs):
+        self.docs = docs
+
+    @staticmethod
+    def _values(doc, field):
+        head, _, rest = field.partition(".")
+        value = doc.get(head)
+        if not rest:
+            return [value]
+        return [item.get(rest) for item in value or []]
+
+    def find(self, query, projection=None):
+        return [doc for doc in self.docs
+                if any(set(self._values(doc, field)) & set(cond["$in"])
+                       for clause in query["$or"] for field, cond in clause.items())]
+
+def _write(storage, key):
+    path = os.path.join(storage.root, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x")
+    old = time.time() - Settings.GC_GRACE_SECONDS - 60
+    os.utime(path, (old, old))
+
+def test_gc_resumes_past_the_per_run_cap(tmp_path, monkeypatch):
+    storage = LocalStorage(str(tmp_path))
+    live = [f"0{i}/aa/live{i}.png" for i in range(6)]
+    orphans = ["ff/aa/orphan0.png", "ff/bb/orphan1.png"]
+    for key in live + orphans:
+        _write(storage, key)
+
+    monkeypatch.setattr(maintenance_tasks, "get_storage", lambda: storage)
+    redis = StubRedis()
+    monkeypatch.setattr(maintenance_tasks, "get_redis", lambda: redis)
+    monkeypatch.setattr(maintenance_tasks.job_store, "referenced_paths", lambda paths: set(paths) & set(live))
+    monkeypatch.setattr(Settings, "GC_MAX_FILES_PER_RUN", 3)
+    monkeypatch.setattr(Settings, "GC_BATCH_PAUSE", 0)
+
+    reports = [maintenance_tasks.gc_output_files() for _ in range(3)]
+
+    assert [r["scanned"] for r in reports] == [3, 3, 2]
+    assert [r["pass_complete"] for r in reports] == [False, False, True]
+    assert reports[1]["resumed_from"] == live[2]
+    assert sum(r["deleted"] for r in reports) == 2
+    assert not any(storage.exists(key) for key in orphans)
+    assert all(storage.exists(key) for key in live)
+    assert redis.get(Settings.GC_CURSOR_KEY) is None
+
+def test_iter_objects_start_after_skips_earlier_keys(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    keys = ["aa/01/a.png", "aa/02/b.png", "ab/01/c.png"]
+    for key in keys:
+        _write(storage, key)
+
+    assert [obj.key for obj in storage.iter_objects()] == keys
+    assert [obj.key for obj in storage.iter_objects("aa/01/a.png")] == keys[1:]
+
+def test_gc_keeps_inputs_of_queued_batch(tmp_path, monkeypatch):
+    storage = LocalStorage(str(tmp_path))
+    inputs = ["1a/2b/input0.png", "3c/4d/input1.png"]
+    orphan = "5e/6f/orphan.png"
+    for key in inputs + [orphan]:
+        _write(storage, key)
+    batch = {"job_id": "batch-1", "type": "image_batch", "status": "queued", "processed_files": [],
+             "files": [{"index": i, "filename": os.path.basename(key), "file_path": key} for i, key in enumerate(inputs)]}
+
+    monkeypatch.setattr(maintenance_tasks, "get_storage", lambda: storage)
+    monkeypatch.setattr(maintenance_tasks, "get_redis", lambda: StubRedis())
+    monkeypatch.setattr(maintenance_tasks.job_store, "get_jobs", lambda: StubJobs([batch]))
+    monkeypatch.setattr(Settings, "GC_BATCH_PAUSE", 0)
+
+    report = maintenance_tasks.gc_output_files()
+
+    assert report["deleted"] == 1
+    assert not storage.exists(orphan)
+    assert all(storage.exists(key) for key in inputs)
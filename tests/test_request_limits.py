@@ -0,0 +1,30 @@
+from io import BytesIO
+from flask import Flask, request
+from app.request_limits import LimitedRequest, body_limit
+
+def make_client():
+    app = Flask(__name__)
+    app.request_class = LimitedRequest
+    app.config["MAX_CONTENT_LENGTH"] = 1024
+
+    @app.route("/default", methods=["POST"])
+    def default():
+        return str(len(request.get_data()))
+
+    @app.route("/large", methods=["POST"])
+    @body_limit(lambda: 8 * 1024)
+    def large():
+        return str(len(request.files["file"].read()))
+
+    return app.test_client()
+
+def test_global_limit_still_applies_elsewhere():
+    assert make_client().post("/default", data=b"x" * 2048).status_code == 413
+
+def test_view_limit_replaces_global_limit():
+    client = make_client()
+    response = client.post("/large", data={"file": (BytesIO(b"x" * 4096), "a.png")})
+    assert response.status_code == 200 and response.text == "4096"
+
+    response = client.post("/large", data={"file": (BytesIO(b"x" * 16384), "a.png")})
+    assert response.status_code == 413
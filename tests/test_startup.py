@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Well under the 30 s server selection timeout below, with headroom for slow CI imports.
+STARTUP_BUDGET_SECONDS = 10.0
+
+SNIPPET = (
+    "import time; started = time.perf_counter(); "
+    "from app.factory import create_app; create_app(); "
+    "print(time.perf_counter() - started)"
+)
+
+def test_create_app_does_not_wait_for_mongo(tmp_path):
+    # Nothing listens on port 1, so any Mongo round trip on the startup path would block
+    # for the server selection timeout.
+    env = {
+        **os.environ,
+        "MONGO_URI": "mongodb://127.0.0.1:1/jobs?serverSelectionTimeoutMS=30000",
+        "FILE_OUTPUT_DIR": str(tmp_path / "outputs"),
+        "PYTHONPATH": ROOT
+    }
+    output = subprocess.run(
+        [sys.executable, "-c", SNIPPET],
+        capture_output=True, text=True, env=env, timeout=60,
+        cwd=tmp_path
+    )
+    assert output.returncode == 0, output.stderr
+    assert float(output.stdout.strip().splitlines()[-1]) < STARTUP_BUDGET_SECONDS
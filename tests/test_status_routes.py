@@ -0,0 +1,88 @@
+import os
+from datetime import datetime, timedelta
+import pytest
+from flask import Flask
+from app.routes import status_routes
+from app.settings import Settings
+from app.storage.local import LocalStorage
+
+class StubCursor(list):
+    def sort(self, keys):
+        return self
+
+    def limit(self, n):
+        return StubCursor(self[:n])
+
+class StubJobs:
+    def __init__(self, jobs):
+        self.jobs = jobs
+
+    def find(self, query, projection=None):
+        if "job_id" in query:
+            wanted = query["job_id"]["$in"]
+            return StubCursor(job for job in self.jobs if job["job_id"] in wanted)
+        return StubCursor(self.jobs)
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    now = datetime(2026, 1, 1)
+    app.jobs = StubJobs([
+        {"job_id": f"job-{i}", "status": "ready", "updated_at": now - timedelta(minutes=i)}
+        for i in range(3)
+    ])
+    app.register_blueprint(status_routes.bp, url_prefix="/api")
+    return app.test_client()
+
+@pytest.mark.parametrize("limit", ["0", "-1", "abc"])
+def test_list_jobs_rejects_invalid_limit(client, limit):
+    response = client.get(f"/api/jobs?limit={limit}")
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "invalid_query"
+
+def test_list_jobs_limit_one_pages(client):
+    body = client.get("/api/jobs?limit=1").get_json()
+    assert [job["job_id"] for job in body["jobs"]] == ["job-0"]
+    assert body["next_cursor"]
+
+@pytest.mark.parametrize("value, expected", [
+    (None, [0, 1, 2, 3]),
+    ("2", [2]),
+    ("3,0-1,1", [0, 1, 3]),
+])
+def test_parse_indices(value, expected):
+    assert status_routes.parse_indices(value, 4) == expected
+
+@pytest.mark.parametrize("value", ["4", "0-4", "3-1", "0-999999999999999", "-1"])
+def test_parse_indices_rejects_out_of_range_before_expanding(value):
+    with pytest.raises((IndexError, ValueError)):
+        status_routes.parse_indices(value, 4)
+
+def test_status_batch_reports_found_and_missing(client):
+    body = client.post("/api/jobs/status:batch", json={"job_ids": ["job-1", "nope"]}).get_json()
+    assert [job["job_id"] for job in body["jobs"]] == ["job-1"]
+    assert body["missing"] == ["nope"]
+
+@pytest.mark.parametrize("payload", [
+    {"job_ids": [{"a": 1}]},
+    {"job_ids": [["job-1"]]},
+    {"job_ids": ["job-1", ""]},
+    {"job_ids": [1, 2]},
+    {"job_ids": "job-1"},
+    ["job-1"],
+])
+def test_status_batch_rejects_malformed_job_ids(client, payload):
+    assert client.post("/api/jobs/status:batch", json=payload).status_code == 400
+
+def test_x_sendfile_offload_uses_absolute_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    storage = LocalStorage("./output")
+    key = storage.put_bytes(b"png bytes", ".png")
+    monkeypatch.setattr(status_routes, "get_storage", lambda: storage)
+    monkeypatch.setattr(Settings, "DOWNLOAD_OFFLOAD", "x-sendfile")
+
+    with Flask(__name__).test_request_context("/"):
+        response = status_routes.send_stored_file(key, "result.png")
+
+    assert response.headers["X-Sendfile"] == os.path.join(str(tmp_path), "output", key)
+    assert os.path.isabs(response.headers["X-Sendfile"])
@@ -0,0 +1,17 @@
+import os
+import time
+from app.storage.local import LocalStorage
+
+def test_dedup_hit_refreshes_mtime(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    key = storage.put_bytes(b"same bytes", ".png")
+    old = time.time() - 7200
+    os.utime(storage.local_path(key), (old, old))
+
+    assert storage.put_bytes(b"same bytes", ".png") == key
+    assert storage.mtime(key) > old + 3600
+
+def test_touch_and_mtime_on_missing_key(tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    assert storage.touch("ab/cd/missing.png") is False
+    assert storage.mtime("ab/cd/missing.png") is None
@@ -0,0 +1,63 @@
+import json
+import pytest
+from flask import Flask
+from langchain_core.documents import Document
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+from app.rag import rag_pipeline
+from app.settings import Settings
+from app.streaming import sse_response
+
+def parse_events(body: str) -> list[tuple[str, object]]:
+    assert body.endswith("\n\n")
+    events = []
+    for frame in body[:-2].split("\n\n"):
+        event_line, data_line = frame.split("\n")
+        assert event_line.startswith("event: ") and data_line.startswith("data: ")
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+
+    @app.route("/rag")
+    def rag():
+        return sse_response(rag_pipeline.stream_answer("what is streamed?"))
+
+    @app.route("/broken")
+    def broken():
+        def events():
+            yield "token", "partial"
+            raise RuntimeError("llm went away")
+        return sse_response(events())
+
+    return app.test_client()
+
+@pytest.fixture
+def fake_rag(monkeypatch):
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content="Tokens arrive one by one")]))
+    docs = [Document(page_content="streaming context", metadata={"source": "test"})]
+    monkeypatch.setattr(Settings, "RAG_ANSWER_CACHE_SIZE", 0)
+    monkeypatch.setattr(rag_pipeline, "_document_chain", None)
+    monkeypatch.setattr(rag_pipeline, "get_rag_llm", lambda: llm)
+    monkeypatch.setattr(rag_pipeline, "get_retriever", lambda: RunnableLambda(lambda question: docs))
+
+def test_rag_stream_frames_sources_tokens_and_done(client, fake_rag):
+    response = client.get("/rag")
+    assert response.mimetype == "text/event-stream"
+    assert response.headers["Cache-Control"] == "no-cache"
+
+    events = parse_events(response.get_data(as_text=True))
+    names = [name for name, _ in events]
+    assert names[0] == "sources"
+    assert events[0][1] == [{"page_content": "streaming context", "metadata": {"source": "test"}}]
+    assert names[-1] == "done" and names.count("done") == 1
+    assert set(names[1:-1]) == {"token"} and len(names) > 3
+    assert "".join(data for name, data in events if name == "token") == "Tokens arrive one by one"
+    assert events[-1][1]["cached"] is False
+
+def test_stream_failure_ends_with_error_event(client):
+    events = parse_events(client.get("/broken").get_data(as_text=True))
+    assert events == [("token", "partial"), ("error", {"error": "llm went away"})]
@@ -0,0 +1,59 @@
+import threading
+import time
+import pytest
+from app.rag import vector_service
+from app.rag.vector_store import RWLock
+from app.settings import Settings
+
+def test_readers_share_the_lock_and_writers_exclude_them():
+    lock = RWLock()
+    inside, peak, guard = 0, 0, threading.Lock()
+
+    def read():
+        nonlocal inside, peak
+        with lock.read():
+            with guard:
+                inside += 1
+                peak = max(peak, inside)
+            time.sleep(0.05)
+            with guard:
+                inside -= 1
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for t in readers:
+        t.start()
+    time.sleep(0.01)
+    with lock.write():
+        assert inside == 0
+    for t in readers:
+        t.join()
+    assert peak > 1
+
+def test_waiting_writer_holds_back_new_readers():
+    lock = RWLock()
+    order = []
+
+    def write():
+        with lock.write():
+            order.append("write")
+
+    def read():
+        with lock.read():
+            order.append("read")
+
+    with lock.read():
+        writer = threading.Thread(target=write)
+        writer.start()
+        time.sleep(0.02)
+        reader = threading.Thread(target=read)
+        reader.start()
+        time.sleep(0.02)
+        assert order == []
+    writer.join(1)
+    reader.join(1)
+    assert order == ["write", "read"]
+
+def test_service_refuses_to_start_without_a_token(monkeypatch):
+    monkeypatch.setattr(Settings, "VECTOR_SERVICE_TOKEN", None)
+    with pytest.raises(RuntimeError, match="VECTOR_SERVICE_TOKEN"):
+        vector_service.create_service()